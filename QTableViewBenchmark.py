@@ -0,0 +1,182 @@
+# Headless benchmarks for the table demo in QTableViewHeaderColorAndSort.py
+#
+# Every table size runs in its own process so the peak memory is for that
+# size only. The results are printed and written as JSON so two commits
+# can be compared:
+#
+#   python QTableViewBenchmark.py --output before.json
+#   python QTableViewBenchmark.py --output after.json --compare before.json
+#   python QTableViewBenchmark.py --rows 1000 10000000
+import argparse
+import io
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import time
+
+# No window is needed, render everything off screen
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+SIZES = [1000, 10000, 100000, 1000000]
+COLUMNS = 5
+
+
+def timed(function, *args):
+    start = time.perf_counter()
+    result = function(*args)
+    return time.perf_counter() - start, result
+
+
+# Runs one table size and gives back a dictionary of the results
+def benchmark(rows, seed=0):
+    import numpy as np
+    from PyQt6.QtCore import Qt
+    from PyQt6.QtWidgets import QApplication
+    import QTableViewHeaderColorAndSort as demo
+
+    # Count how many times the view asks for data
+    class CountingModel(demo.WindowTableModel):
+        calls = 0
+
+        def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+            CountingModel.calls += 1
+            return super().data(index, role)
+
+    app = QApplication.instance() or QApplication([])
+    results = {"rows": rows, "columns": COLUMNS}
+    data = np.random.default_rng(seed).integers(1, 20, (rows, COLUMNS))
+
+    # Time to first paint is everything from handing over the data
+    # to the table being drawn for the first time
+    start = time.perf_counter()
+    datamodel = CountingModel(data)
+    proxymodel = demo.WindowProxyModel()
+    proxymodel.setSourceModel(datamodel)
+    headerview = demo.WindowHeaderView(Qt.Orientation.Horizontal)
+    headermodel = demo.WindowHeaderModel()
+    headermodel.setHeaderFromList([chr(ord("A") + j) for j in range(COLUMNS)])
+    headerview.setDefaultColor("#F0F1BC")
+    headerview.setColumnColors({"A": {"color": "#EDEDED", "index": 0}})
+    headerview.setModel(headermodel)
+    tableview = demo.WindowTableView()
+    tableview.setModel(proxymodel)
+    tableview.setHorizontalHeader(headerview)
+    tableview.resize(800, 600)
+    tableview.show()
+    app.processEvents()
+    # grab() makes the widget paint even though nothing is on screen
+    tableview.grab()
+    results["first_paint_s"] = time.perf_counter() - start
+
+    CountingModel.calls = 0
+    results["repaint_s"], _ = timed(tableview.viewport().grab)
+    results["data_calls_per_repaint"] = CountingModel.calls
+    results["header_repaint_s"], _ = timed(headerview.grab)
+
+    results["unique_values_cold_s"], _ = timed(datamodel.uniqueValues, 0)
+    results["unique_values_warm_s"], _ = timed(datamodel.uniqueValues, 0)
+
+    results["sort_asc_cold_s"], _ = timed(proxymodel.sort, 1, Qt.SortOrder.AscendingOrder)
+    results["sort_desc_s"], _ = timed(proxymodel.sort, 1, Qt.SortOrder.DescendingOrder)
+    results["sort_asc_warm_s"], _ = timed(proxymodel.sort, 1, Qt.SortOrder.AscendingOrder)
+    results["filter_s"], _ = timed(datamodel.applyFilter, "7", proxymodel, 2)
+    results["filter_rows"] = proxymodel.rowCount()
+    results["filter_clear_s"], _ = timed(datamodel.applyFilter, "All", proxymodel, 2)
+    # Several values, a range and AND/OR across columns on the bitmap index
+    rowFilter = ((demo.RowFilter(2, values=[3, 7, 11]) | demo.RowFilter(3, between=(15, None)))
+                 & demo.RowFilter(4, between=(None, 10)))
+    results["filter_multi_s"], _ = timed(proxymodel.setRowFilter, rowFilter)
+    results["filter_multi_rows"] = proxymodel.rowCount()
+    results["filter_switch_s"], _ = timed(datamodel.applyFilter, ["4", "5"], proxymodel, 2)
+    proxymodel.clearFilter()
+
+    # Copy Table to a buffer, waiting for the worker thread
+    def export():
+        buffer = io.StringIO()
+        tableview.exportTable(buffer).wait()
+        return buffer.tell()
+    seconds, size = timed(export)
+    results["copy_table_s"] = seconds
+    results["copy_table_rows_per_s"] = rows / seconds if seconds else None
+    results["copy_table_mb_per_s"] = size / seconds / 1e6 if seconds else None
+
+    # Copy a whole column through the selection
+    tableview.selectColumn(1)
+    seconds, text = timed(tableview.selectionText)
+    results["copy_selection_s"] = seconds
+    results["copy_selection_rows_per_s"] = rows / seconds if seconds else None
+    tableview.clearSelection()
+
+    # ru_maxrss is in kilobytes on Linux and bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    results["peak_rss_mb"] = peak / (1024 * 1024 if sys.platform == "darwin" else 1024)
+    tableview.close()
+    return results
+
+
+def commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip() or None
+    except OSError:
+        return None
+
+
+def printResults(runs, baseline=None):
+    base = {run["rows"]: run for run in baseline["runs"]} if baseline else {}
+    for run in runs:
+        print(f"\n{run['rows']:,} rows")
+        old = base.get(run["rows"], {})
+        for key, value in run.items():
+            if key in ("rows", "columns") or value is None:
+                continue
+            line = f"  {key:28} {value:14.6g}"
+            if old.get(key):
+                line += f"   x{value / old[key]:.2f} vs baseline"
+            print(line)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the table demo without a display")
+    parser.add_argument("--rows", type=int, nargs="+", default=SIZES, help="table sizes to run")
+    parser.add_argument("--output", help="write the results to this JSON file")
+    parser.add_argument("--compare", help="a JSON file from an earlier run to compare against")
+    parser.add_argument("--single", type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    # The child process for one size
+    if args.single:
+        json.dump(benchmark(args.single), sys.stdout)
+        return
+
+    runs = []
+    for rows in args.rows:
+        child = subprocess.run([sys.executable, os.path.abspath(__file__), "--single", str(rows)],
+                               capture_output=True, text=True)
+        if child.returncode != 0:
+            print(f"{rows:,} rows failed:\n{child.stderr}", file=sys.stderr)
+            continue
+        runs.append(json.loads(child.stdout.strip().splitlines()[-1]))
+
+    report = {
+        "commit": commit(),
+        "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "runs": runs,
+    }
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+    printResults(runs, baseline)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,19 +1,37 @@
 # Demo for customizing a QTableView, QHeaderView and table sorting with a QComboBox
+import time
+# When we started, for the --profile-startup timeline
+_STARTED = time.perf_counter()
+import bisect
+import collections
 import csv
 import io
+import itertools
+import re
 import sys
+import threading
 import copy, random
-from PyQt6.QtCore import QAbstractTableModel, Qt, QAbstractItemModel, QSortFilterProxyModel, QDateTime, QModelIndex
-from PyQt6.QtGui import QColor, QKeySequence
+import datetime
+import functools
+from PyQt6.QtCore import QAbstractTableModel, Qt, QAbstractItemModel, QDateTime, QModelIndex, \
+    QTimer, QAbstractProxyModel, QThread, pyqtSignal, QRect, QPoint, QObject, QEvent
+from PyQt6.QtGui import QColor, QKeySequence, QBrush, QFont, QPen, QPixmap, QPainter, QPolygon, \
+    QStandardItemModel, QStandardItem
 from PyQt6.QtWidgets import QTableView, QApplication, QMainWindow, QHeaderView, QGridLayout, QWidget, QComboBox, QLabel, \
-    QMenu
-import pandas as pd
+    QMenu, QProgressDialog, QFileDialog, QDockWidget, QCheckBox, QPushButton, QTableWidget, QTableWidgetItem, \
+    QStylePainter, QStyleOptionComboBox, QStyle, QMessageBox
+import numpy as np
 
 
 class WindowTableView(QTableView):
 
     def __init__(self):
         super().__init__()
+        self._exporter = None
+        self._sortKeys = []
+        self._sorter = None
+        self._sorters = []
+        self._sortConnection = None
 
     # Define a pop-up menu when we right click
     # and allow copy key to work
@@ -24,6 +42,8 @@ class WindowTableView(QTableView):
 
         tcopy = menu.addAction("Copy Table")
         tcopy.setShortcut(QKeySequence('Ctrl+T'))
+
+        texport = menu.addAction("Export Table...")
         action = menu.exec(self.mapToGlobal(event.pos()))
 
         if action == mcopy:
@@ -31,54 +51,346 @@ class WindowTableView(QTableView):
 
         if action == tcopy:
             self.copyWithHeader()
+
+        if action == texport:
+            path, _ = QFileDialog.getSaveFileName(self, "Export Table", "", "Tab separated (*.tsv *.txt);;CSV (*.csv)")
+            if path:
+                self.exportTable(path, ',' if path.lower().endswith('.csv') else '\t')
     """
     Copy the data to the clipboard
     """
     def copySelection(self):
-        selection = self.selectedIndexes()
-        if selection:
-            rows = sorted(index.row() for index in selection)
-            columns = sorted(index.column() for index in selection)
-            rowcount = rows[-1] - rows[0] + 1
-            colcount = columns[-1] - columns[0] + 1
-            table = [[''] * colcount for _ in range(rowcount)]
-            for index in selection:
-                row = index.row() - rows[0]
-                column = index.column() - columns[0]
-                table[row][column] = index.data()
-
-                if type(table[row][column]) == QDateTime:
-                    table[row][column]=table[row][column].toString("MM/dd/yyyy hh:mm:ss")
-            stream = io.StringIO()
-            csv.writer(stream, delimiter='\t').writerows(table)
-            QApplication.clipboard().setText(stream.getvalue())
+        text = self.selectionText()
+        if text:
+            QApplication.clipboard().setText(text)
+
+    # The selected cells as tab separated text. The selection is a handful
+    # of rectangles (QItemSelectionRange) so we work on those instead of
+    # one QModelIndex per cell. The rows are cut into bands that have the
+    # same selected columns and each band is read from the store as whole
+    # columns. Cells inside the bounding box that aren't selected are blank.
+    def selectionText(self, delimiter='\t'):
+        ranges = [r for r in self.selectionModel().selection() if r.isValid()]
+        if not ranges:
+            return ''
+        left = min(r.left() for r in ranges)
+        right = max(r.right() for r in ranges)
+        store, rows = self.sourceRows()
+
+        stream = io.StringIO()
+        writer = csv.writer(stream, delimiter=delimiter, lineterminator='\n')
+        blank = delimiter * (right - left) + '\n'
+        edges = sorted({r.top() for r in ranges} | {r.bottom() + 1 for r in ranges})
+        for first, end in zip(edges, edges[1:]):
+            columns = sorted({c for r in ranges if r.top() <= first <= r.bottom()
+                              for c in range(r.left(), r.right() + 1)})
+            if not columns:
+                # Nothing selected in these rows, keep the gap
+                stream.write(blank * (end - first))
+                continue
+            values = dict(zip(columns, (formatColumn(c).tolist() for c in store.take(rows[first:end], columns))))
+            blanks = itertools.repeat('')
+            writer.writerows(zip(*[values.get(c, blanks) for c in range(left, right + 1)]))
+        return stream.getvalue()
+
+    # Sort from the header instead of setSortingEnabled(). A click sorts
+    # on that column (again flips it) and Shift+click adds the column as
+    # the next sort key (or flips it if it is already one). The sorting is
+    # done by a SortWorker thread with the progress shown in the header.
+    def setMultiColumnSorting(self, enabled):
+        header = self.horizontalHeader()
+        if self._sortConnection is not None:
+            header.sectionClicked.disconnect(self._sortConnection)
+            self._sortConnection = None
+        if enabled:
+            self.setSortingEnabled(False)
+            header.setSectionsClickable(True)
+            header.setSortIndicatorShown(False)
+            self._sortConnection = header.sectionClicked.connect(self._headerClicked)
+
+    def _headerClicked(self, section):
+        flip = {Qt.SortOrder.AscendingOrder: Qt.SortOrder.DescendingOrder,
+                Qt.SortOrder.DescendingOrder: Qt.SortOrder.AscendingOrder}
+        keys = list(self._sortKeys)
+        if QApplication.keyboardModifiers() & Qt.KeyboardModifier.ShiftModifier:
+            for i, (column, order) in enumerate(keys):
+                if column == section:
+                    keys[i] = (column, flip[order])
+                    break
+            else:
+                keys.append((section, Qt.SortOrder.AscendingOrder))
+        elif len(keys) == 1 and keys[0][0] == section:
+            keys = [(section, flip[keys[0][1]])]
+        else:
+            keys = [(section, Qt.SortOrder.AscendingOrder)]
+        self.sortByColumns(keys)
+
+    # Sort on [(column, Qt.SortOrder)], first sort key first. A sort that
+    # is still running is cancelled and its result thrown away.
+    def sortByColumns(self, keys):
+        self._sortKeys = list(keys)
+        header = self.horizontalHeader()
+        if isinstance(header, WindowHeaderView):
+            header.setSortIndicators(self._sortKeys)
+        if self._sorter is not None:
+            self._sorter.requestInterruption()
+            # Its last steps must not move the bar of the next sort
+            try:
+                self._sorter.progress.disconnect()
+            except TypeError:
+                pass
+            if isinstance(header, WindowHeaderView):
+                header.setProgress(-1)
+            self._sorter = None
+
+        proxy = self.model()
+        if not isinstance(proxy, WindowProxyModel):
+            if self._sortKeys:
+                self.sortByColumn(*self._sortKeys[0])
+            return
+        # A single column that has been sorted before is already cached
+        if not self._sortKeys or (len(self._sortKeys) == 1 and self._sortKeys[0][0] in proxy._permutations):
+            proxy.setSortKeys(self._sortKeys)
+            return
+
+        sourcemodel = proxy.sourceModel()
+        sorter = SortWorker(sourcemodel.store(), self._sortKeys)
+        if isinstance(header, WindowHeaderView):
+            sorter.progress.connect(header.setProgress)
+            header.setProgress(0)
+        generation = sourcemodel.generation() if isinstance(sourcemodel, WindowTableModel) else None
+        sorter.sortDone.connect(lambda permutation, keys, sorter=sorter, generation=generation:
+                                self._sorted(sorter, permutation, keys, generation))
+        sorter.finished.connect(lambda sorter=sorter: self._sorters.remove(sorter))
+        # Keep hold of it until the thread is done, even when cancelled
+        self._sorters.append(sorter)
+        self._sorter = sorter
+        sorter.start()
+        return sorter
+
+    def _sorted(self, sorter, permutation, keys, generation=None):
+        if sorter is not self._sorter:
+            # An older sort that finished anyway
+            return
+        self._sorter = None
+        sourcemodel = self.model().sourceModel()
+        rowcount = sourcemodel.store().rowCount()
+        if ((isinstance(sourcemodel, WindowTableModel) and sourcemodel.generation() != generation)
+                or sorter.rows > rowcount or (len(keys) > 1 and sorter.rows != rowcount)):
+            # Cells were edited (or rows went away) while it was sorting.
+            # Rows appended to a single column sort are merged in by the
+            # proxy, anything else is sorted again.
+            self.sortByColumns(keys)
+            return
+        header = self.horizontalHeader()
+        if isinstance(header, WindowHeaderView):
+            header.setProgress(-1)
+        self.model().setSortKeys(keys, permutation)
+
+    # The data model's store and the source rows in the order they
+    # are shown. Only the proxy knows which source row is shown where.
+    def sourceRows(self):
+        tablemodel = self.model()
+        sourcemodel = tablemodel.sourceModel() if isinstance(tablemodel, QAbstractProxyModel) else tablemodel
+        if isinstance(tablemodel, WindowProxyModel):
+            rows = tablemodel.sourceRows().copy()
+        elif sourcemodel is tablemodel:
+            rows = np.arange(tablemodel.rowCount())
+        else:
+            rows = np.array([tablemodel.mapToSource(tablemodel.index(i, 0)).row()
+                             for i in range(tablemodel.rowCount())], dtype=np.int64)
+        return sourcemodel.store(), rows
 
     def copyWithHeader(self):
-        rowcount = self.model().rowCount()
-        colcount = self.model().columnCount()
+        return self.exportTable('clipboard')
+
+    # Write the whole table (as it is sorted and filtered) to the
+    # clipboard, a file name or any text stream like io.StringIO.
+    # The work is done by a TableExporter thread so the window keeps
+    # going, and a progress dialog shows up if it takes a while.
+    def exportTable(self, target, delimiter='\t'):
+        if self._exporter is not None and self._exporter.isRunning():
+            self._exporter.requestInterruption()
+            self._exporter.wait()
+        store, rows = self.sourceRows()
         headermodel = self.horizontalHeader().model()
-        tablemodel = self.model()
-        rowdata = []
-        dataframe = []
-        # Print the header
-        for j in range(0, colcount):
-            rowdata.append(headermodel.headerData(j, Qt.Orientation.Horizontal, Qt.ItemDataRole.DisplayRole))
-        dataframe.append(copy.copy(rowdata))
-        rowdata.clear()
-        # Print the detail
-        for i in range(rowcount):
-            for j in range(colcount):
-                modeldata = tablemodel.index(i, j).data()
-                if type(modeldata) == QDateTime:
-                    rowdata.append(modeldata.toString('MM/dd/yyyy hh:mm:ss'))
-                elif type(modeldata) == int or type(modeldata) == float:
-                    rowdata.append(str(modeldata))
-                else:
-                    rowdata.append(modeldata)
-            dataframe.append(copy.copy(rowdata))
-            rowdata.clear()
-        df = pd.DataFrame(dataframe)
-        df.to_clipboard()
+        header = [headermodel.headerData(j, Qt.Orientation.Horizontal, Qt.ItemDataRole.DisplayRole)
+                  for j in range(store.columnCount())]
+
+        exporter = TableExporter(store, rows, header, target, delimiter)
+        progress = QProgressDialog("Exporting table...", "Cancel", 0, len(rows), self)
+        progress.setWindowModality(Qt.WindowModality.WindowModal)
+        progress.canceled.connect(exporter.requestInterruption)
+        exporter.progress.connect(progress.setValue)
+        exporter.exported.connect(lambda result, exporter=exporter: self._exported(exporter, result))
+        exporter.failed.connect(progress.close)
+        exporter.failed.connect(self._exportFailed)
+        exporter.finished.connect(progress.deleteLater)
+        self._exporter = exporter
+        exporter.start()
+        return exporter
+
+    def _exported(self, exporter, result):
+        if exporter.target == 'clipboard' and not exporter.cancelled:
+            QApplication.clipboard().setText(result)
+
+    def _exportFailed(self, message):
+        QMessageBox.warning(self, "Export Table", "The table could not be exported:\n" + message)
+
+DATE_FORMAT = "MM/dd/yyyy hh:mm:ss"
+
+
+# Turn a column array into strings for copying. Dates are written as
+# DATE_FORMAT, numbers the way python prints them and None as nothing.
+def formatColumn(values):
+    kind = values.dtype.kind
+    if kind == 'M':
+        # Rearrange the characters of the ISO text instead of
+        # formatting every date on its own
+        text = np.datetime_as_string(values, unit='s').astype('U19')
+        chars = text.view('U1').reshape(-1, 19)
+        out = np.empty((len(values), 19), dtype='U1')
+        out[:, 0:2] = chars[:, 5:7]
+        out[:, 2] = '/'
+        out[:, 3:5] = chars[:, 8:10]
+        out[:, 5] = '/'
+        out[:, 6:10] = chars[:, 0:4]
+        out[:, 10] = ' '
+        out[:, 11:19] = chars[:, 11:19]
+        out = out.view('U19').ravel().astype(object)
+        out[np.isnat(values)] = ''
+        return out
+    if kind == 'S':
+        return np.char.decode(values, errors='replace').astype(object)
+    if kind != 'O':
+        return values.astype(str)
+    return np.array([_formatValue(v) for v in values.tolist()], dtype=object)
+
+
+def _formatValue(value):
+    if value is None:
+        return ''
+    if isinstance(value, QDateTime):
+        return value.toString(DATE_FORMAT)
+    if isinstance(value, datetime.datetime):
+        return value.strftime('%m/%d/%Y %H:%M:%S')
+    return value if isinstance(value, str) else str(value)
+
+
+class TableExporter(QThread):
+    # Writes a table out on a worker thread. It reads the rows from the
+    # store a chunk at a time, formats each column of the chunk in one go
+    # and writes it straight to the target. Only the clipboard needs the
+    # whole text at the end, files and streams are written as we go.
+    # When the file can't be opened or written failed is sent instead
+    # of exported, with the error message.
+    progress = pyqtSignal(int)
+    exported = pyqtSignal(object)
+    failed = pyqtSignal(str)
+
+    def __init__(self, store, rows, header, target, delimiter='\t', chunkRows=50000):
+        super().__init__()
+        self.target = target
+        self.cancelled = False
+        self._store = store
+        self._rows = rows
+        self._header = header
+        self._delimiter = delimiter
+        self._chunkRows = chunkRows
+
+    # Overridden. An exception escaping run() would abort the whole app.
+    def run(self):
+        try:
+            self._write()
+        except OSError as error:
+            self.failed.emit(str(error))
+
+    def _write(self):
+        if self.target == 'clipboard':
+            stream = io.StringIO()
+        elif isinstance(self.target, str):
+            stream = open(self.target, 'w', newline='')
+        else:
+            stream = self.target
+        try:
+            writer = csv.writer(stream, delimiter=self._delimiter, lineterminator='\n')
+            writer.writerow(self._header)
+            for start in range(0, len(self._rows), self._chunkRows):
+                if self.isInterruptionRequested():
+                    self.cancelled = True
+                    break
+                chunk = self._store.take(self._rows[start:start + self._chunkRows])
+                writer.writerows(zip(*[formatColumn(column).tolist() for column in chunk]))
+                self.progress.emit(start + len(chunk[0]) if chunk else start)
+        finally:
+            # Only close the files we opened
+            if isinstance(self.target, str) and self.target != 'clipboard':
+                stream.close()
+        self.exported.emit(stream.getvalue() if self.target == 'clipboard' else self.target)
+
+
+class CheckComboBox(QComboBox):
+    # A combo box where more than one value can be ticked. The popup stays
+    # open while ticking and checkedChanged is sent with the ticked texts.
+    # Ticking "All" unticks everything else. aboutToShowPopup lets the
+    # items be filled in at the last moment.
+    checkedChanged = pyqtSignal(list)
+    aboutToShowPopup = pyqtSignal()
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setModel(QStandardItemModel(self))
+        self.view().pressed.connect(self._pressed)
+        self._keepOpen = False
+
+    # Overridden
+    def addItems(self, texts):
+        for text in texts:
+            item = QStandardItem(text)
+            # The ticks are flipped in _pressed(), not by the view
+            item.setFlags(Qt.ItemFlag.ItemIsEnabled | Qt.ItemFlag.ItemIsSelectable)
+            item.setData(Qt.CheckState.Unchecked, Qt.ItemDataRole.CheckStateRole)
+            self.model().appendRow(item)
+
+    def checkedTexts(self):
+        model = self.model()
+        return [model.item(i).text() for i in range(model.rowCount())
+                if model.item(i).checkState() == Qt.CheckState.Checked]
+
+    def _pressed(self, index):
+        model = self.model()
+        item = model.itemFromIndex(index)
+        checked = item.checkState() != Qt.CheckState.Checked
+        for i in range(model.rowCount()):
+            other = model.item(i)
+            if other is not item and (item.text() == 'All' or other.text() == 'All') and checked:
+                other.setCheckState(Qt.CheckState.Unchecked)
+        item.setCheckState(Qt.CheckState.Checked if checked else Qt.CheckState.Unchecked)
+        self._keepOpen = True
+        self.update()
+        self.checkedChanged.emit(self.checkedTexts())
+
+    # Overridden
+    def showPopup(self):
+        self.aboutToShowPopup.emit()
+        super().showPopup()
+
+    # Overridden
+    def hidePopup(self):
+        if self._keepOpen:
+            self._keepOpen = False
+            return
+        super().hidePopup()
+
+    # Overridden, show the ticked values instead of the current item
+    def paintEvent(self, event):
+        painter = QStylePainter(self)
+        option = QStyleOptionComboBox()
+        self.initStyleOption(option)
+        option.currentText = ', '.join(self.checkedTexts()) or 'All'
+        painter.drawComplexControl(QStyle.ComplexControl.CC_ComboBox, option)
+        painter.drawControl(QStyle.ControlElement.CE_ComboBoxLabel, option)
+
 
 class WindowHeaderView(QHeaderView):
     def __init__(self, orientation):
@@ -98,15 +410,110 @@ class WindowHeaderView(QHeaderView):
         # }
         self._columnDict = {}
 
+        # Everything paintSection() needs is worked out ahead of time and
+        # kept by logical index: (brush or None, header text). It is only
+        # rebuilt when the header data or the colors change.
+        self._sections = []
+        self._defaultBrush = None
+        self._borderPen = QPen(QColor('#C0C0C0'))
+        # logical index -> (sort order, priority) for sorting on more
+        # than one column. Priority 0 doesn't get a number drawn.
+        self._sortIndicators = {}
+        # Rendered sections when pixmap caching is turned on
+        self._pixmaps = None
+        self._connections = []
+        # Percent done of a sort in progress, -1 when there isn't one
+        self._progress = -1
+
     # This sets the column dictionary. I copy it incase the
     # original columnDict gets garbage collected
     def setColumnColors(self, columnDict):
         self._columnDict = copy.copy(columnDict)
+        self._rebuildSections()
+
+    # The color for every section that isn't in the column dictionary.
+    # This takes the place of a "::section {background-color: ...}"
+    # stylesheet. None goes back to the normal header look.
+    def setDefaultColor(self, color):
+        self._defaultBrush = None if color is None else QBrush(QColor(color))
+        self._rebuildSections()
+
+    # Keep a pixmap of every painted section and just copy it
+    # the next time, handy when scrolling across lots of columns
+    def setPixmapCaching(self, enabled):
+        self._pixmaps = {} if enabled else None
+        self.viewport().update()
+
+    # Show a sort indicator on several sections at once. indicators is a
+    # list of (logical index, Qt.SortOrder) with the first sort key first.
+    def setSortIndicators(self, indicators):
+        numbered = len(indicators) > 1
+        self._sortIndicators = {section: (order, n + 1 if numbered else 0)
+                                for n, (section, order) in enumerate(indicators)}
+        self.viewport().update()
+
+    # Show how far along a sort is as a bar along the bottom. -1 hides it.
+    def setProgress(self, percent):
+        self._progress = percent
+        self.viewport().update()
+
+    # Overridden
+    def paintEvent(self, event):
+        super().paintEvent(event)
+        if self._progress >= 0:
+            painter = QPainter(self.viewport())
+            width = self.viewport().width() * self._progress // 100
+            painter.fillRect(QRect(0, self.viewport().height() - 3, width, 3), self.palette().highlight())
+            painter.end()
 
     # Overriden
     def setModel(self, model):
+        for connection in self._connections:
+            self.disconnect(connection)
         super().setModel(model)
+        self._connections = []
+        if model is not None:
+            self._connections = [
+                model.headerDataChanged.connect(self._rebuildSections),
+                model.modelReset.connect(self._rebuildSections),
+                model.columnsInserted.connect(self._rebuildSections),
+                model.columnsRemoved.connect(self._rebuildSections),
+                model.rowsInserted.connect(self._rebuildSections),
+                model.rowsRemoved.connect(self._rebuildSections),
+            ]
+        self._rebuildSections()
 
+    def _rebuildSections(self, *args):
+        self._sections = []
+        model = self.model()
+        if model is not None:
+            if self._orientation == Qt.Orientation.Horizontal:
+                count = model.columnCount(QModelIndex())
+            else:
+                count = model.rowCount(QModelIndex())
+            colors = {entry["index"]: (text, QBrush(QColor(entry["color"])))
+                      for text, entry in self._columnDict.items()}
+            for i in range(count):
+                headertext = model.headerData(i, self._orientation, Qt.ItemDataRole.DisplayRole)
+                headertext = '' if headertext is None else str(headertext)
+                # The color only counts if the text and the index both match
+                name, brush = colors.get(i, (None, None))
+                if name != headertext:
+                    brush = self._defaultBrush
+                self._sections.append((brush, headertext))
+        if self._pixmaps is not None:
+            self._pixmaps.clear()
+        self.viewport().update()
+
+    # Overridden
+    # Make room for headers with more than one line of text
+    def sectionSizeFromContents(self, logicalIndex):
+        size = super().sectionSizeFromContents(logicalIndex)
+        if logicalIndex < len(self._sections):
+            lines = self._sections[logicalIndex][1].count('\n') + 1
+            if lines > 1:
+                size.setHeight(max(size.height(), lines * self.fontMetrics().height() + 6))
+        return size
 
     # Overridden
     # This is a very short custom painting routine for the header. This is where
@@ -115,19 +522,62 @@ class WindowHeaderView(QHeaderView):
     # nice outset border, etc. All that has to be coded here. Luckily, the rect
     # is given to us for doing the work.
     def paintSection(self, painter, rect, logicalIndex):
-        headertext = self.model().headerData(logicalIndex, Qt.Orientation.Horizontal, Qt.ItemDataRole.DisplayRole)
-        try:
-            self._index = self._columnDict[headertext]["index"]
-            self._columncolor = self._columnDict[headertext]["color"]
-
-            if self._orientation == Qt.Orientation.Horizontal and logicalIndex == self._index:
-                # Custom painting
-                painter.fillRect(rect, QColor(self._columncolor))
-                painter.drawText(rect, Qt.AlignmentFlag.AlignCenter, headertext)
-                return
-        except KeyError:
-            self._index = -1
+        if logicalIndex >= len(self._sections):
             super().paintSection(painter, rect, logicalIndex)
+            return
+        brush, headertext = self._sections[logicalIndex]
+        indicator = self._sortIndicators.get(logicalIndex)
+        if indicator is None and self.isSortIndicatorShown() and logicalIndex == self.sortIndicatorSection():
+            indicator = (self.sortIndicatorOrder(), 0)
+        if brush is None and indicator is None and '\n' not in headertext:
+            super().paintSection(painter, rect, logicalIndex)
+            return
+
+        # Custom painting
+        if self._pixmaps is None:
+            self._drawSection(painter, rect, brush, headertext, indicator)
+            return
+        key = (logicalIndex, rect.width(), rect.height(), indicator)
+        pixmap = self._pixmaps.get(key)
+        if pixmap is None:
+            if len(self._pixmaps) > 4 * len(self._sections):
+                # Old sizes from resizing the sections
+                self._pixmaps.clear()
+            ratio = self.devicePixelRatioF()
+            pixmap = QPixmap(rect.size() * ratio)
+            pixmap.setDevicePixelRatio(ratio)
+            pixmap.fill(Qt.GlobalColor.transparent)
+            pixmappainter = QPainter(pixmap)
+            pixmappainter.setFont(painter.font())
+            self._drawSection(pixmappainter, QRect(0, 0, rect.width(), rect.height()), brush, headertext, indicator)
+            pixmappainter.end()
+            self._pixmaps[key] = pixmap
+        painter.drawPixmap(rect.topLeft(), pixmap)
+
+    def _drawSection(self, painter, rect, brush, headertext, indicator):
+        painter.fillRect(rect, brush if brush is not None else self.palette().button())
+        painter.setPen(self._borderPen)
+        painter.drawLine(rect.topRight(), rect.bottomRight())
+        painter.drawLine(rect.bottomLeft(), rect.bottomRight())
+        painter.setPen(self.palette().buttonText().color())
+        textrect = rect.adjusted(2, 0, -2, 0)
+        if indicator is not None:
+            order, priority = indicator
+            textrect.setRight(textrect.right() - 12)
+            # A small triangle on the right, pointing up for ascending
+            x = rect.right() - 10
+            y = rect.center().y()
+            if order == Qt.SortOrder.AscendingOrder:
+                triangle = QPolygon([QPoint(x, y + 2), QPoint(x + 6, y + 2), QPoint(x + 3, y - 2)])
+            else:
+                triangle = QPolygon([QPoint(x, y - 2), QPoint(x + 6, y - 2), QPoint(x + 3, y + 2)])
+            painter.setBrush(self.palette().buttonText())
+            painter.drawPolygon(triangle)
+            painter.setBrush(Qt.BrushStyle.NoBrush)
+            if priority:
+                painter.drawText(QRect(x - 2, rect.top(), 10, y - 2 - rect.top()),
+                                 Qt.AlignmentFlag.AlignHCenter | Qt.AlignmentFlag.AlignBottom, str(priority))
+        painter.drawText(textrect, Qt.AlignmentFlag.AlignCenter, headertext)
 
 class WindowHeaderModel(QAbstractItemModel):
     def __init__(self):
@@ -151,7 +601,7 @@ class WindowHeaderModel(QAbstractItemModel):
 
         if orientation == Qt.Orientation.Horizontal and role == Qt.ItemDataRole.DisplayRole:
             self._header[section] = value
-            self.headerDataChanged.emit(section, section)
+            self.headerDataChanged.emit(orientation, section, section)
             return True
 
         super().setHeaderData(self, section, orientation, value, role)
@@ -167,36 +617,874 @@ class WindowHeaderModel(QAbstractItemModel):
         return len(self._header)
 
 
+class ListStore:
+    # The original list of lists storage. Every cell is a python object
+    # which is fine for a few thousand rows. It is kept around so anything
+    # handing us a list of lists still behaves exactly the way it used to.
+    def __init__(self, data):
+        self._data = data
+
+    def rowCount(self):
+        return len(self._data)
+
+    def columnCount(self):
+        return len(self._data[0]) if self._data else 0
+
+    def value(self, row, column):
+        return self._data[row][column]
+
+    def setValue(self, row, column, value):
+        self._data[row][column] = value
+
+    def setValues(self, column, rows, values):
+        for row, value in zip(rows.tolist(), values):
+            self._data[row][column] = value
+
+    # Hand back a whole column as an array so the bulk paths
+    # (unique values, filters, copies) can work on either store
+    def column(self, column):
+        values = np.empty(len(self._data), dtype=object)
+        values[:] = [row[column] for row in self._data]
+        return values
+
+    def row(self, row):
+        return list(self._data[row])
+
+    def append(self, rows):
+        self._data.extend(rows)
+
+    # The given rows as one array per column
+    def take(self, rows, columns=None):
+        picked = [self._data[r] for r in rows.tolist()]
+        result = []
+        for j in (range(self.columnCount()) if columns is None else columns):
+            values = np.empty(len(picked), dtype=object)
+            values[:] = [row[j] for row in picked]
+            result.append(values)
+        return result
+
+
+class ColumnStore:
+    # Column oriented storage. Each column is one typed NumPy array so
+    # an int column costs 8 bytes a cell instead of a python object and
+    # the bulk paths can be vectorized. Columns that cannot be typed
+    # (strings, mixed values) fall back to an object array.
+    def __init__(self, columns, names=None):
+        self._columns = [np.asarray(c) for c in columns]
+        if len({len(c) for c in self._columns}) > 1:
+            raise ValueError("All columns must have the same length")
+        self._columns = [c.astype(object) if c.dtype.kind in "US" else c for c in self._columns]
+        self.names = list(names) if names is not None else [str(i) for i in range(len(self._columns))]
+        # The arrays can be longer than the table when rows are being
+        # appended (see append()), _size is the number of real rows
+        self._size = len(self._columns[0]) if self._columns else 0
+
+    # Build from a list of lists (row major) like the demo data
+    @classmethod
+    def fromRows(cls, rows, names=None):
+        if not rows:
+            return cls([], names)
+        return cls([ColumnStore._typed([row[j] for row in rows]) for j in range(len(rows[0]))], names)
+
+    # Build from a 2 dimensional ndarray or a structured (record) array
+    @classmethod
+    def fromArray(cls, array, names=None):
+        array = np.asarray(array)
+        if array.dtype.names:
+            return cls([array[n] for n in array.dtype.names], names or array.dtype.names)
+        if array.ndim != 2:
+            raise ValueError("Expected a 2 dimensional array")
+        # Copy each column so they are contiguous and not views into the original
+        return cls([np.ascontiguousarray(array[:, j]) for j in range(array.shape[1])], names)
+
+    # Build from a pandas DataFrame. We don't import pandas here,
+    # we only need the columns and their arrays.
+    @classmethod
+    def fromDataFrame(cls, df):
+        return cls([df[c].to_numpy() for c in df.columns], [str(c) for c in df.columns])
+
+    # Build from a list of dictionaries or tuples (records)
+    @classmethod
+    def fromRecords(cls, records, names=None):
+        records = list(records)
+        if records and isinstance(records[0], dict):
+            names = names or list(records[0].keys())
+            return cls([ColumnStore._typed([r.get(n) for r in records]) for n in names], names)
+        return cls.fromRows([list(r) for r in records], names)
+
+    # Pick whichever of the above fits what we were handed
+    @classmethod
+    def fromData(cls, data, names=None):
+        if isinstance(data, ColumnStore):
+            return data
+        if isinstance(data, np.ndarray):
+            return cls.fromArray(data, names)
+        if hasattr(data, "columns") and hasattr(data, "to_numpy"):
+            return cls.fromDataFrame(data)
+        data = list(data)
+        if data and isinstance(data[0], (dict, tuple)):
+            return cls.fromRecords(data, names)
+        return cls.fromRows(data, names)
+
+    # Let NumPy pick the type for a column. Strings and
+    # mixed columns are kept as python objects.
+    @staticmethod
+    def _typed(values):
+        try:
+            column = np.asarray(values)
+        except (ValueError, TypeError):
+            column = None
+        if column is None or column.ndim != 1 or column.dtype.kind in "US":
+            column = np.empty(len(values), dtype=object)
+            column[:] = values
+        return column
+
+    def rowCount(self):
+        return self._size
+
+    def columnCount(self):
+        return len(self._columns)
+
+    # Qt doesn't know what to do with NumPy scalars
+    # so convert them back to python values
+    def value(self, row, column):
+        v = self._columns[column][row]
+        return v.item() if isinstance(v, np.generic) else v
+
+    def setValue(self, row, column, value):
+        self._widen(column, np.asarray(value).dtype)[row] = value
+
+    # Set a batch of cells in one column at once
+    def setValues(self, column, rows, values):
+        values = ColumnStore._typed(list(values))
+        self._widen(column, values.dtype)[rows] = values
+
+    # Widen the column if the values don't fit, ie. a float in
+    # an int column. Anything else turns it into objects.
+    def _widen(self, column, dtype):
+        array = self._columns[column]
+        if array.dtype != object:
+            try:
+                wider = np.result_type(array.dtype, dtype)
+            except TypeError:
+                wider = np.dtype(object)
+            if wider.kind in "US":
+                wider = np.dtype(object)
+            if wider != array.dtype:
+                array = self._columns[column] = array.astype(wider)
+        return array
+
+    def column(self, column):
+        return self._columns[column][:self._size]
+
+    def row(self, row):
+        return [self.value(row, j) for j in range(len(self._columns))]
+
+    # The given rows as one array per column
+    def take(self, rows, columns=None):
+        if columns is None:
+            return [column[rows] for column in self._columns]
+        return [self._columns[j][rows] for j in columns]
+
+    # Add a batch of rows. The arrays grow by doubling so
+    # appending chunk after chunk doesn't copy everything each time.
+    def append(self, rows):
+        if not rows:
+            return
+        count = len(rows)
+        needed = self._size + count
+        for j, column in enumerate(self._columns):
+            values = ColumnStore._typed([row[j] for row in rows])
+            if self._size == 0:
+                dtype = values.dtype
+            else:
+                try:
+                    dtype = np.result_type(column.dtype, values.dtype)
+                except TypeError:
+                    dtype = np.dtype(object)
+            if dtype.kind in "US":
+                dtype = np.dtype(object)
+            if len(column) < needed or dtype != column.dtype:
+                grown = np.empty(max(needed, 2 * len(column)), dtype=dtype)
+                grown[:self._size] = column[:self._size]
+                column = self._columns[j] = grown
+            column[self._size:needed] = values
+        self._size = needed
+
+
+class MappedStore(ColumnStore):
+    # A read only ColumnStore whose columns are views straight into a
+    # memory mapped file. Nothing is copied or turned into python objects
+    # up front so opening a file bigger than memory is instant and only
+    # the pages that are read (painted, sorted, copied) end up in memory.
+    def __init__(self, columns, names=None, source=None):
+        self._columns = list(columns)
+        self.names = list(names) if names is not None else [str(i) for i in range(len(self._columns))]
+        self._size = len(self._columns[0]) if self._columns else 0
+        # Whatever owns the mapping (np.memmap, pyarrow table) so it stays open
+        self._source = source
+
+    # A structured (fixed width record) .npy file or a 2 dimensional one
+    @classmethod
+    def fromNpy(cls, path, names=None):
+        return cls.fromMapped(np.load(path, mmap_mode='r'), names)
+
+    # A raw file of fixed width records. dtype describes one record,
+    # ie. np.dtype([('id', '<i8'), ('price', '<f8'), ('code', 'S8')])
+    @classmethod
+    def fromBinary(cls, path, dtype, offset=0, names=None):
+        return cls.fromMapped(np.memmap(path, dtype=np.dtype(dtype), mode='r', offset=offset), names)
+
+    @classmethod
+    def fromMapped(cls, array, names=None):
+        if array.dtype.names:
+            return cls([array[n] for n in array.dtype.names], names or array.dtype.names, array)
+        if array.ndim != 2:
+            raise ValueError("Expected a 2 dimensional array or fixed width records")
+        return cls([array[:, j] for j in range(array.shape[1])], names, array)
+
+    # An Arrow IPC (feather v2) file. Single chunk numeric columns without
+    # nulls are used in place, anything else (text, nulls, several chunks)
+    # has to be converted by pyarrow and is copied into memory.
+    @classmethod
+    def fromArrow(cls, path):
+        import pyarrow
+        import pyarrow.ipc
+        table = pyarrow.ipc.open_file(pyarrow.memory_map(path, 'r')).read_all()
+        columns = []
+        for column in table.columns:
+            # Booleans are packed 8 to a byte in Arrow so they have to be copied
+            if (column.num_chunks == 1 and column.null_count == 0 and pyarrow.types.is_primitive(column.type)
+                    and not pyarrow.types.is_boolean(column.type)):
+                columns.append(column.chunk(0).to_numpy(zero_copy_only=True))
+            else:
+                columns.append(column.to_numpy())
+        return cls(columns, table.column_names, table)
+
+    # Fixed width text comes back as bytes
+    def value(self, row, column):
+        v = self._columns[column][row]
+        if isinstance(v, bytes):
+            return v.decode(errors='replace')
+        return v.item() if isinstance(v, np.generic) else v
+
+    def setValue(self, row, column, value):
+        raise TypeError("A memory mapped table is read only")
+
+    def setValues(self, column, rows, values):
+        raise TypeError("A memory mapped table is read only")
+
+    def append(self, rows):
+        raise TypeError("A memory mapped table is read only")
+
+
+# NaN isn't equal to itself, so every NaN would be a dict key of its own
+# and could never be looked up again. The indexes keep them all under
+# this one NaN instead.
+NAN = float('nan')
+
+
+def _indexKey(value):
+    return NAN if isinstance(value, float) and value != value else value
+
+
+class DistinctIndex:
+    # Keeps the distinct values of every column along with how many times
+    # each one shows up. Each column is built with one np.unique() pass and
+    # after that setData() just moves counts around, so asking for the
+    # sorted values of a column costs O(k) for k distinct values. A column
+    # is only built the first time it is asked for so a column of ids
+    # doesn't turn into millions of python objects for nothing.
+    def __init__(self, store):
+        self._store = store
+        self._counts = [None] * store.columnCount()
+        self._sorted = [None] * store.columnCount()
+
+    def _column(self, column):
+        if self._counts[column] is None:
+            self._counts[column], self._sorted[column] = self._build(self._store.column(column))
+        return self._counts[column]
+
+    @staticmethod
+    def _build(column):
+        try:
+            values, counts = np.unique(column, return_counts=True)
+        except TypeError:
+            # Mixed types in an object column. Count them the slow way.
+            counts = collections.Counter(_indexKey(v) for v in column.tolist())
+            return dict(counts), DistinctIndex._sort(counts)
+        if values.dtype.kind in 'fO':
+            # Put every NaN under the one key
+            index = {}
+            for value, count in zip(values.tolist(), counts.tolist()):
+                value = _indexKey(value)
+                index[value] = index.get(value, 0) + count
+            return index, list(index)
+        ordered = values.tolist()
+        return dict(zip(ordered, counts.tolist())), ordered
+
+    # Sort values that may not be comparable with each other
+    @staticmethod
+    def _sort(values):
+        try:
+            return sorted(values)
+        except TypeError:
+            return sorted(values, key=lambda v: (type(v).__name__, str(v)))
+
+    def values(self, column):
+        self._column(column)
+        return self._sorted[column]
+
+    def count(self, column, value):
+        return self._column(column).get(_indexKey(value), 0)
+
+    # The columns that haven't been built yet are skipped below, they
+    # will be built from the store as it is when they are asked for.
+    def _add(self, column, value, count=1):
+        counts = self._counts[column]
+        if counts is None:
+            return
+        value = _indexKey(value)
+        if value in counts:
+            counts[value] += count
+            return
+        counts[value] = count
+        ordered = self._sorted[column]
+        try:
+            bisect.insort(ordered, value)
+        except TypeError:
+            self._sorted[column] = self._sort(counts)
+
+    def _remove(self, column, value, count=1):
+        counts = self._counts[column]
+        if counts is None:
+            return
+        value = _indexKey(value)
+        counts[value] -= count
+        if counts[value] == 0:
+            del counts[value]
+            self._sorted[column].remove(value)
+
+    # Called by the model when a cell changes
+    def update(self, column, old, new):
+        if old == new:
+            return
+        self._remove(column, old)
+        self._add(column, new)
+
+    # Called by the model when a batch of cells in a column changes
+    def replace(self, column, old, new):
+        if self._counts[column] is None:
+            return
+        for value, count in self._build(old)[0].items():
+            self._remove(column, value, count)
+        for value, count in self._build(new)[0].items():
+            self._add(column, value, count)
+
+    # Called by the model after rows have been appended to the store
+    def extend(self, first, last):
+        for j in range(len(self._counts)):
+            if self._counts[j] is None:
+                continue
+            counts, _ = self._build(self._store.column(j)[first:last + 1])
+            for value, count in counts.items():
+                self._add(j, value, count)
+
+
+class InvertedIndex:
+    # For each value of a column, a bitmap of the rows that have it (one
+    # bit per row, packed 8 to a byte, row r is bit r & 7 of byte r >> 3).
+    # A filter is then just OR-ing the bitmaps of the values it wants and
+    # AND/OR-ing the columns together instead of scanning the table.
+    # Like the DistinctIndex a column is only built the first time it is
+    # filtered on, and setData() only flips the bits of the cells that
+    # changed. A column with more than MAX_BITMAPS values (ids, prices)
+    # would take too much memory so it is scanned instead.
+    MAX_BITMAPS = 256
+
+    def __init__(self, store):
+        self._store = store
+        self._size = store.rowCount()
+        self._capacity = max(1, (self._size + 7) // 8)
+        self._bitmaps = [None] * store.columnCount()
+        self._keys = [None] * store.columnCount()
+        self._scanned = set()
+
+    def rowCount(self):
+        return self._size
+
+    def _column(self, column):
+        if self._bitmaps[column] is None and column not in self._scanned:
+            self._build(column)
+        return self._bitmaps[column]
+
+    def _build(self, column):
+        values = self._store.column(column)
+        try:
+            keys, inverse = np.unique(values, return_inverse=True)
+        except TypeError:
+            # Values that don't sort together can't be looked up by range
+            self._scanned.add(column)
+            return
+        if len(keys) > InvertedIndex.MAX_BITMAPS:
+            self._scanned.add(column)
+            return
+        inverse = inverse.ravel()
+        bitmaps = {}
+        for n, key in enumerate(keys.tolist()):
+            packed = self._pack(inverse == n)
+            key = _indexKey(key)
+            if key in bitmaps:
+                # Another NaN (object columns don't put them together)
+                bitmaps[key] |= packed
+            else:
+                bitmaps[key] = packed
+        self._bitmaps[column] = bitmaps
+        # The sorted keys are for ranges, which NaN is never in
+        self._keys[column] = [key for key in bitmaps if key is not NAN]
+
+    # Give up on the bitmaps for a column and scan it from now on
+    def _scan(self, column):
+        self._bitmaps[column] = None
+        self._keys[column] = None
+        self._scanned.add(column)
+
+    def _bitmap(self, column, value):
+        value = _indexKey(value)
+        bitmap = self._bitmaps[column].get(value)
+        if bitmap is None:
+            if len(self._bitmaps[column]) >= InvertedIndex.MAX_BITMAPS:
+                self._scan(column)
+                return None
+            try:
+                if value is not NAN:
+                    bisect.insort(self._keys[column], value)
+            except TypeError:
+                self._scan(column)
+                return None
+            bitmap = self._bitmaps[column][value] = np.zeros(self._capacity, dtype=np.uint8)
+        return bitmap
+
+    def _pack(self, mask):
+        bitmap = np.zeros(self._capacity, dtype=np.uint8)
+        packed = np.packbits(mask, bitorder='little')
+        bitmap[:len(packed)] = packed
+        return bitmap
+
+    # The bitmap of the rows where the column is any of the values
+    def values(self, column, values):
+        bitmaps = self._column(column)
+        if bitmaps is None:
+            data = self._store.column(column)
+            mask = np.zeros(len(data), dtype=bool)
+            for value in values:
+                if _indexKey(value) is NAN:
+                    mask |= _compare(data, lambda v: v != v)
+                else:
+                    mask |= _compare(data, lambda v: v == value)
+            return self._pack(mask)
+        result = np.zeros(self._capacity, dtype=np.uint8)
+        for value in values:
+            bitmap = bitmaps.get(_indexKey(value))
+            if bitmap is not None:
+                result |= bitmap
+        return result
+
+    # The bitmap of the rows where low <= value <= high. Either end
+    # can be None to leave that side open.
+    def between(self, column, low, high):
+        bitmaps = self._column(column)
+        if bitmaps is None:
+            data = self._store.column(column)
+            mask = np.ones(len(data), dtype=bool)
+            if low is not None:
+                mask &= _compare(data, lambda v: v >= low)
+            if high is not None:
+                mask &= _compare(data, lambda v: v <= high)
+            return self._pack(mask)
+        keys = self._keys[column]
+        first = 0 if low is None else bisect.bisect_left(keys, low)
+        last = len(keys) if high is None else bisect.bisect_right(keys, high)
+        return self.values(column, keys[first:last])
+
+    # Every row, for a filter with nothing in it
+    def everything(self):
+        return self._pack(np.ones(self._size, dtype=bool))
+
+    # Turn a bitmap back into a boolean mask over the rows
+    def mask(self, bitmap):
+        return np.unpackbits(bitmap, count=self._size, bitorder='little').astype(bool)
+
+    # Called by the model when a cell changes
+    def update(self, row, column, old, new):
+        if self._bitmaps[column] is None or old == new:
+            return
+        rows = np.array([row], dtype=np.int64)
+        self.replace(column, rows, np.array([old], dtype=object), np.array([new], dtype=object))
+
+    # Called by the model when a batch of cells in a column changes
+    def replace(self, column, rows, old, new):
+        if self._bitmaps[column] is None:
+            return
+        rows = np.asarray(rows, dtype=np.int64)
+        for value, where in _groups(old):
+            bitmap = self._bitmaps[column].get(_indexKey(value))
+            if bitmap is not None:
+                _clearBits(bitmap, rows[where])
+        for value, where in _groups(new):
+            bitmap = self._bitmap(column, value)
+            if bitmap is None:
+                return
+            _setBits(bitmap, rows[where])
+
+    # Called by the model after rows have been appended to the store.
+    # The bitmaps grow by doubling like the ColumnStore does.
+    def extend(self, first, last):
+        self._size = last + 1
+        needed = (self._size + 7) // 8
+        if needed > self._capacity:
+            self._capacity = max(needed, 2 * self._capacity)
+            for bitmaps in self._bitmaps:
+                for value, bitmap in (bitmaps or {}).items():
+                    grown = np.zeros(self._capacity, dtype=np.uint8)
+                    grown[:len(bitmap)] = bitmap
+                    bitmaps[value] = grown
+        rows = np.arange(first, last + 1, dtype=np.int64)
+        for j in range(len(self._bitmaps)):
+            if self._bitmaps[j] is not None:
+                self.replace(j, rows, np.empty(0, dtype=object), self._store.column(j)[first:last + 1])
+
+
+# The positions of each distinct value in a small array of values
+def _groups(values):
+    groups = {}
+    for i, value in enumerate(np.asarray(values).tolist()):
+        groups.setdefault(_indexKey(value), []).append(i)
+    return groups.items()
+
+
+def _setBits(bitmap, rows):
+    np.bitwise_or.at(bitmap, rows >> 3, (1 << (rows & 7)).astype(np.uint8))
+
+
+def _clearBits(bitmap, rows):
+    np.bitwise_and.at(bitmap, rows >> 3, ~(1 << (rows & 7)).astype(np.uint8))
+
+
+class RowFilter:
+    # Which rows the proxy shows. RowFilter(column, values=[...]) keeps the
+    # rows where the column is one of the values and
+    # RowFilter(column, between=(low, high)) the ones in an inclusive range
+    # (None leaves an end open). Filters combine with & (both) and | (either),
+    # ie. (RowFilter(0, values=[1, 2]) | RowFilter(1, between=(5, None))) & RowFilter(2, values=['x']).
+    # They are worked out on the model's InvertedIndex.
+    def __init__(self, column=None, values=None, between=None, op=None, parts=()):
+        self.column = column
+        self._values = None if values is None else list(values)
+        self._between = between
+        self._op = op
+        self._parts = list(parts)
+
+    def __and__(self, other):
+        return RowFilter(op='and', parts=[self, other])
+
+    def __or__(self, other):
+        return RowFilter(op='or', parts=[self, other])
+
+    # The columns the filter looks at
+    def columns(self):
+        if self._op is None:
+            return {self.column}
+        return set().union(*(part.columns() for part in self._parts))
+
+    # The packed bitmap of the rows that pass, see InvertedIndex
+    def bitmap(self, index):
+        if self._op is None:
+            if self._between is not None:
+                return index.between(self.column, *self._between)
+            return index.values(self.column, self._values or [])
+        result = None
+        for part in self._parts:
+            bitmap = part.bitmap(index)
+            if result is None:
+                result = bitmap
+            elif self._op == 'and':
+                result &= bitmap
+            else:
+                result |= bitmap
+        return index.everything() if result is None else result
+
+    def mask(self, index):
+        return index.mask(self.bitmap(index))
+
+
+class StyleRule:
+    # Says how to draw the cells of a column that match. A rule can match
+    # values above or below a threshold, in an inclusive (low, high) range,
+    # in a set of values or where a predicate is True. The predicate is
+    # handed the whole column array and should give back a boolean array,
+    # a function that takes one value and returns a bool works too.
+    # column=None applies the rule to every column.
+    def __init__(self, column=None, above=None, below=None, between=None, values=None, predicate=None,
+                 background=None, foreground=None, font=None, alignment=None):
+        self.column = column
+        self._above = above
+        self._below = below
+        self._between = between
+        self._values = None if values is None else list(values)
+        self._predicate = predicate
+        # Build the brushes and fonts once, every cell that matches shares them
+        self.roles = {}
+        if background is not None:
+            self.roles[Qt.ItemDataRole.BackgroundRole] = QBrush(QColor(background))
+        if foreground is not None:
+            self.roles[Qt.ItemDataRole.ForegroundRole] = QBrush(QColor(foreground))
+        if font is not None:
+            self.roles[Qt.ItemDataRole.FontRole] = QFont(font)
+        if alignment is not None:
+            self.roles[Qt.ItemDataRole.TextAlignmentRole] = alignment
+
+    def appliesTo(self, column):
+        return self.column is None or self.column == column
+
+    # A boolean array of which values match
+    def matches(self, values):
+        mask = np.ones(len(values), dtype=bool)
+        if self._above is not None:
+            mask &= _compare(values, lambda v: v > self._above)
+        if self._below is not None:
+            mask &= _compare(values, lambda v: v < self._below)
+        if self._between is not None:
+            low, high = self._between
+            mask &= _compare(values, lambda v: (v >= low) & (v <= high))
+        if self._values is not None:
+            mask &= _compare(values, lambda v: np.isin(v, self._values))
+        if self._predicate is not None:
+            mask &= _compare(values, self._predicate)
+        return mask
+
+
+# Run a test over a whole column. When that doesn't work (text in an
+# object column, a predicate that only takes one value) try it cell by
+# cell and treat anything that can't be compared as not matching.
+def _compare(values, test):
+    try:
+        result = np.asarray(test(values))
+        if result.shape == values.shape:
+            return result.astype(bool)
+    except (TypeError, ValueError):
+        pass
+    mask = np.zeros(len(values), dtype=bool)
+    for i, value in enumerate(values.tolist()):
+        try:
+            mask[i] = bool(test(value))
+        except (TypeError, ValueError):
+            pass
+    return mask
+
+
+class CellStyles:
+    # Works out which StyleRule applies to each cell ahead of time. Every
+    # column gets a small array of style numbers (0 means no rule, n means
+    # rule n-1) and each role has a list of the pre-built objects by style
+    # number, so data() is two lookups and never builds a QColor. When more
+    # than one rule matches a cell, the first one in the list wins.
+    # Columns that no rule applies to don't get an array (None).
+    def __init__(self, rules, store):
+        self._rules = list(rules)
+        self._store = store
+        self._byRole = {}
+        for n, rule in enumerate(self._rules, start=1):
+            for role, value in rule.roles.items():
+                self._byRole.setdefault(role, [None] * (len(self._rules) + 1))[n] = value
+        self._dtype = np.uint8 if len(self._rules) < 255 else np.uint16
+        self._ids = [self._evaluate(j, store.column(j)) if self._applies(j) else None
+                     for j in range(store.columnCount())]
+        self._size = store.rowCount()
+
+    def _applies(self, column):
+        return any(rule.appliesTo(column) for rule in self._rules)
+
+    def roles(self):
+        return self._byRole.keys()
+
+    def _evaluate(self, column, values):
+        ids = np.zeros(len(values), dtype=self._dtype)
+        # Go backwards so the earlier rules are written last and win
+        for n in range(len(self._rules), 0, -1):
+            rule = self._rules[n - 1]
+            if rule.appliesTo(column):
+                ids[rule.matches(values)] = n
+        return ids
+
+    # The pre-built object for the role, or None
+    def value(self, row, column, role):
+        byRole = self._byRole.get(role)
+        ids = self._ids[column]
+        if byRole is None or ids is None:
+            return None
+        return byRole[ids[row]]
+
+    # Called by the model after a cell changes. The cell is read back
+    # with take() so it is typed like its column without building the
+    # whole column (a ListStore makes a new array for column()).
+    def update(self, row, column, value):
+        self.updateRows(column, np.array([row], dtype=np.int64))
+
+    # Called by the model when a batch of cells in a column changes
+    def updateRows(self, column, rows):
+        if self._ids[column] is None:
+            return
+        self._ids[column][rows] = self._evaluate(column, self._store.take(rows, [column])[0])
+
+    # Called by the model after rows have been appended to the store.
+    # The arrays grow by doubling like the ColumnStore does.
+    def extend(self, first, last):
+        needed = last + 1
+        for j, ids in enumerate(self._ids):
+            if ids is None:
+                continue
+            if len(ids) < needed:
+                grown = np.zeros(max(needed, 2 * len(ids)), dtype=self._dtype)
+                grown[:self._size] = ids[:self._size]
+                ids = self._ids[j] = grown
+            ids[first:needed] = self._evaluate(j, self._store.column(j)[first:needed])
+        self._size = needed
+
+
+# Read a CSV file in chunks. The first thing yielded is the header row
+# then lists of up to chunkRows converted rows until the file runs out.
+def csvChunks(path, chunkRows=5000, delimiter=','):
+    with open(path, newline='') as f:
+        reader = csv.reader(f, delimiter=delimiter)
+        header = next(reader, [])
+        yield header
+        while True:
+            chunk = list(itertools.islice(reader, chunkRows))
+            if not chunk:
+                return
+            yield convertChunk(chunk, len(header))
+
+
+# Convert the text in a chunk a column at a time. A column that parses
+# as ints becomes ints, then floats, otherwise it is left as text. Empty
+# fields in a column of numbers are NaN so the column stays numbers.
+# Every row comes out width long (the header's width), short rows are
+# padded with empty fields.
+def convertChunk(chunk, width=None):
+    if width is None:
+        width = max(len(row) for row in chunk)
+    columns = []
+    for j in range(width):
+        text = np.array([row[j] if j < len(row) else '' for row in chunk], dtype=object)
+        blank = text == ''
+        if blank.any() and not blank.all():
+            numbers = text.copy()
+            numbers[blank] = np.nan
+            casts = ((numbers, np.float64),)
+        else:
+            casts = ((text, np.int64), (text, np.float64))
+        for values, dtype in casts:
+            try:
+                columns.append(values.astype(dtype).tolist())
+                break
+            except (ValueError, TypeError, OverflowError):
+                pass
+        else:
+            columns.append(text.tolist())
+    return [list(row) for row in zip(*columns)]
+
+
 class WindowTableModel(QAbstractTableModel):
+    # This is a custom way to set a specific color for a cell value.
+    # Anything bigger than 7 gets a light green background.
+    DEFAULT_STYLES = [StyleRule(above=7, background='#DEF1BC')]
+
+    # Sent after queued updates have been applied with the columns
+    # that changed. The proxy waits for this before it re-sorts.
+    updatesFlushed = pyqtSignal(list)
+
+    # More rectangles than this in one flush and we just send the
+    # box around all of them
+    MAX_RECTANGLES = 64
+
+    # A list of lists keeps the original list backed storage. Anything
+    # else (ndarray, DataFrame, records, a ColumnStore) goes to columns.
     def __init__(self, data):
         super().__init__()
-        self._data = data
+        if isinstance(data, (ListStore, ColumnStore)):
+            self._store = data
+        elif isinstance(data, list) and (not data or isinstance(data[0], list)):
+            self._store = ListStore(data)
+        else:
+            self._store = ColumnStore.fromData(data)
+        # Built the first time someone asks for unique values
+        self._distinct = None
+        # Built the first time the proxy filters, see RowFilter
+        self._inverted = None
+        # Built the first time a cell is painted
+        self._styleRules = list(WindowTableModel.DEFAULT_STYLES)
+        self._styles = None
+        # Cell updates queued by queueUpdates() from any thread
+        self._pending = []
+        self._pendingLock = threading.Lock()
+        self._updateTimer = None
+        self._flushing = False
+        self._generation = 0
+
+    # Use the column store even when we are handed a list of lists
+    @classmethod
+    def fromColumns(cls, data, names=None):
+        return cls(ColumnStore.fromData(data, names))
+
+    def store(self):
+        return self._store
+
+    # Column names when the data came with them (DataFrame, files, records)
+    def headerNames(self):
+        return getattr(self._store, 'names', None)
 
     def data(self, index, role=Qt.ItemDataRole.DisplayRole):
         if role == Qt.ItemDataRole.DisplayRole or role == Qt.ItemDataRole.EditRole:
-            return self._data[index.row()][index.column()]
+            return self._store.value(index.row(), index.column())
 
-        # This is a custom way to set a specific color for a cell value
-        # This can easily be scoped to look a list of some type too
-        # using a dictionary.
-        if role == Qt.ItemDataRole.BackgroundRole:
-            if self._data[index.row()][index.column()] > 7:
-                return QColor('#DEF1BC')
+        # The colors, fonts and alignment come from the style rules
+        if self._styles is None:
+            self._styles = CellStyles(self._styleRules, self._store)
+        return self._styles.value(index.row(), index.column(), role)
+
+    # Replace the style rules, see StyleRule
+    def setStyleRules(self, rules):
+        self._styleRules = list(rules)
+        self._styles = None
+        if self._store.rowCount():
+            self.dataChanged.emit(self.index(0, 0),
+                                  self.index(self._store.rowCount() - 1, self._store.columnCount() - 1))
 
     # Overridden
     def setData(self, index, value, role=Qt.ItemDataRole.EditRole):
         if role == Qt.ItemDataRole.EditRole:
-            self._data[index.row()][index.column()] = value
+            old = self._store.value(index.row(), index.column())
+            self._store.setValue(index.row(), index.column(), value)
+            self._generation += 1
+            value = self._store.value(index.row(), index.column())
+            if self._distinct is not None:
+                self._distinct.update(index.column(), old, value)
+            if self._inverted is not None:
+                self._inverted.update(index.row(), index.column(), old, value)
+            if self._styles is not None:
+                self._styles.update(index.row(), index.column(), value)
+            self.dataChanged.emit(index, index)
             return True
         return False
 
     # Overridden
     def rowCount(self, index):
-        return len(self._data)
+        return self._store.rowCount()
 
     # Overridden
     def columnCount(self, index):
-        return len(self._data[0])
+        return self._store.columnCount()
 
     # Overridden
     def flags(self, index):
@@ -205,59 +1493,947 @@ class WindowTableModel(QAbstractTableModel):
 
         return super().flags(index) | Qt.ItemFlag.ItemIsEditable
 
-    # This will give us the unique values for the combo box list
-    def uniqueValues(self):
-        values = set()
-        thelist = []
-        for i in range(self.rowCount(0)):
+    def distinctIndex(self):
+        if self._distinct is None:
+            self._distinct = DistinctIndex(self._store)
+        return self._distinct
+
+    def invertedIndex(self):
+        if self._inverted is None:
+            self._inverted = InvertedIndex(self._store)
+        return self._inverted
+
+    # This will give us the unique values for the combo box list.
+    # Without a column, all the columns are mixed together like before.
+    def uniqueValues(self, column=None):
+        index = self.distinctIndex()
+        if column is None:
+            values = set()
             for j in range(self.columnCount(0)):
-                values.add(self._data[i][j])
-        a=list(values)
-        a.sort()
-        a.insert(0, "All")
-        for i in a:
-            thelist.append(str(i))
-        del values # let this be garbage collected
-        return thelist
+                values.update(index.values(j))
+            a = DistinctIndex._sort(values)
+        else:
+            a = index.values(column)
+        return ["All"] + [_displayText(i) for i in a]
+
+    # Queue (row, column, value) updates. This is safe to call from
+    # any thread, the updates are applied on the GUI thread by
+    # flushUpdates() at the rate given to setUpdateRate().
+    def queueUpdates(self, updates):
+        with self._pendingLock:
+            self._pending.extend(updates)
+
+    def queueUpdate(self, row, column, value):
+        self.queueUpdates([(row, column, value)])
+
+    # How many times a second queued updates are applied.
+    # 0 stops applying them (flushUpdates() can still be called).
+    def setUpdateRate(self, fps):
+        if self._updateTimer is None:
+            self._updateTimer = QTimer(self)
+            self._updateTimer.timeout.connect(self.flushUpdates)
+        if fps <= 0:
+            self._updateTimer.stop()
+        else:
+            self._updateTimer.start(max(1, round(1000 / fps)))
+
+    # True while flushUpdates() is sending dataChanged
+    def isFlushing(self):
+        return self._flushing
+
+    # Goes up every time cell values are changed (not when rows are
+    # appended), so work done on a copy of the rows can tell it is stale
+    def generation(self):
+        return self._generation
+
+    # Apply everything queued so far. Only the last value for a cell is
+    # kept, each column is written in one go, the distinct values and
+    # styles are updated in the same pass and the changed cells are sent
+    # as a few dataChanged rectangles instead of one signal per cell.
+    def flushUpdates(self):
+        with self._pendingLock:
+            pending, self._pending = self._pending, []
+        if not pending:
+            return
+        cells = {}
+        for row, column, value in pending:
+            cells[(row, column)] = value
+        columns = {}
+        rowcount = self._store.rowCount()
+        columncount = self._store.columnCount()
+        # Updates for cells that aren't there are dropped
+        for (row, column), value in cells.items():
+            if 0 <= row < rowcount and 0 <= column < columncount:
+                rows, values = columns.setdefault(column, ([], []))
+                rows.append(row)
+                values.append(value)
+
+        changed = {}
+        for column, (rows, values) in columns.items():
+            rows = np.array(rows, dtype=np.int64)
+            old = self._store.take(rows, [column])[0]
+            try:
+                self._store.setValues(column, rows, values)
+            except TypeError:
+                # A read only store (see MappedStore), these are dropped
+                # like the cells that aren't there
+                continue
+            self._generation += 1
+            new = self._store.take(rows, [column])[0]
+            if self._distinct is not None:
+                self._distinct.replace(column, old, new)
+            if self._inverted is not None:
+                self._inverted.replace(column, rows, old, new)
+            if self._styles is not None:
+                self._styles.updateRows(column, rows)
+            changed[column] = np.sort(rows)
+
+        self._flushing = True
+        try:
+            for top, left, bottom, right in _rectangles(changed, WindowTableModel.MAX_RECTANGLES):
+                self.dataChanged.emit(self.index(top, left), self.index(bottom, right))
+        finally:
+            self._flushing = False
+        self.updatesFlushed.emit(sorted(changed))
+
+    # Append a batch of rows and let the views know
+    def appendRows(self, rows):
+        if not rows:
+            return
+        first = self._store.rowCount()
+        self.beginInsertRows(QModelIndex(), first, first + len(rows) - 1)
+        self._store.append(rows)
+        if self._distinct is not None:
+            self._distinct.extend(first, first + len(rows) - 1)
+        if self._inverted is not None:
+            self._inverted.extend(first, first + len(rows) - 1)
+        if self._styles is not None:
+            self._styles.extend(first, first + len(rows) - 1)
+        self.endInsertRows()
 
     # We can even let the model apply the filter
-    # when we select from the combox
-    def applyFilter(self, s, pmodel):
-        if s == 'All':
+    # when we select from the combox. The column is the
+    # one picked in the column combo box. s can also be
+    # a list of the values ticked in the combo box.
+    def applyFilter(self, s, pmodel, column=None):
+        texts = [s] if isinstance(s, str) else list(s)
+        if isinstance(pmodel, WindowProxyModel):
+            # Exact match on the column. The combo box only has the text
+            # so find the value it was made from.
+            if not texts or 'All' in texts or column is None:
+                pmodel.clearFilter()
+            else:
+                values = {_displayText(v): v for v in self.distinctIndex().values(column)}
+                pmodel.setRowFilter(RowFilter(column, values=[values.get(t, t) for t in texts]))
+            return
+        if column is not None:
+            pmodel.setFilterKeyColumn(column)
+        if not texts or 'All' in texts:
             pmodel.setFilterWildcard('*')
+        elif len(texts) == 1:
+            pmodel.setFilterFixedString(texts[0])
+        else:
+            pmodel.setFilterRegularExpression('^(' + '|'.join(re.escape(t) for t in texts) + ')$')
+
+class WindowProxyModel(QAbstractProxyModel):
+    # A sort and filter proxy that works on the whole column instead of
+    # asking data() for every row on every comparison like
+    # QSortFilterProxyModel does.
+    #
+    # _rows holds the source rows in the order they are shown. Sorting
+    # keeps one stable argsort per column so flipping the direction is
+    # just reading it backwards, and filtering is a boolean mask over the
+    # column arrays. Only the rows that actually come and go are signalled
+    # (or a single layout change when they are only moved around).
+    # Until there is a sort or a filter _rows is None, meaning the source
+    # rows as they are, so a huge table doesn't need a row array up front.
+
+    # More runs than this and a reset is cheaper than the row signals
+    MAX_RUNS = 64
+
+    def __init__(self):
+        super().__init__()
+        self._rows = None
+        self._inverse = None
+        self._permutations = {}
+        # [(column, Qt.SortOrder)] with the first sort key first. More than
+        # one key uses _multiOrder, the order for all of them together.
+        self._sortKeys = []
+        self._multiOrder = None
+        self._rowFilter = None
+        self._mask = None
+        self._sourceCount = 0
+        self._stale = False
+        self._connections = []
+        # Sorts several keys again after rows were appended, see _resort()
+        self._sorter = None
+        self._sorters = []
+
+    # Overridden
+    def setSourceModel(self, model):
+        self.beginResetModel()
+        for connection in self._connections:
+            self.disconnect(connection)
+        super().setSourceModel(model)
+        self._connections = [
+            model.dataChanged.connect(self._sourceDataChanged),
+            model.rowsInserted.connect(self._sourceRowsInserted),
+            model.rowsRemoved.connect(self._sourceReset),
+            model.modelReset.connect(self._sourceReset),
+            model.layoutChanged.connect(self._sourceReset),
+            model.updatesFlushed.connect(self._sourceFlushed),
+        ]
+        self._sourceCount = self._store().rowCount()
+        self._permutations.clear()
+        self._multiOrder = None
+        self._stopSorter()
+        self._mask = None
+        self._rows = self._visibleRows()
+        self._inverse = None
+        self.endResetModel()
+
+    def _store(self):
+        return self.sourceModel().store()
+
+    # The source rows in the order they are shown
+    def sourceRows(self):
+        if self._rows is None:
+            return np.arange(self._sourceCount)
+        return self._rows
+
+    def _rowCount(self):
+        return self._sourceCount if self._rows is None else len(self._rows)
+
+    # Overridden
+    def index(self, row, column, parent=QModelIndex()):
+        if parent.isValid() or row < 0 or column < 0 or row >= self._rowCount():
+            return QModelIndex()
+        return self.createIndex(row, column)
+
+    # Overridden
+    def parent(self, index=None):
+        return QModelIndex()
+
+    # Overridden
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else self._rowCount()
+
+    # Overridden
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() or self.sourceModel() is None else self._store().columnCount()
+
+    # Overridden
+    def mapToSource(self, proxyIndex):
+        if not proxyIndex.isValid():
+            return QModelIndex()
+        row = proxyIndex.row() if self._rows is None else int(self._rows[proxyIndex.row()])
+        return self.sourceModel().index(row, proxyIndex.column())
+
+    # Overridden
+    def mapFromSource(self, sourceIndex):
+        if not sourceIndex.isValid():
+            return QModelIndex()
+        if self._rows is None:
+            row = sourceIndex.row() if sourceIndex.row() < self._sourceCount else -1
+        else:
+            row = self._inverseRows()[sourceIndex.row()]
+        if row < 0:
+            return QModelIndex()
+        return self.createIndex(int(row), sourceIndex.column())
+
+    # source row -> proxy row, -1 when the row is filtered out
+    def _inverseRows(self):
+        if self._inverse is None:
+            self._inverse = np.full(self._store().rowCount(), -1, dtype=np.int64)
+            self._inverse[self._rows] = np.arange(len(self._rows))
+        return self._inverse
+
+    # The stable ascending order of a column, kept until the column changes
+    def _permutation(self, column):
+        permutation = self._permutations.get(column)
+        if permutation is None:
+            permutation = self._permutations[column] = _argsort(self._store().column(column))
+        return permutation
+
+    # The sorted source rows, None when there is no sort
+    def _order(self):
+        if not self._sortKeys:
+            return None
+        if len(self._sortKeys) == 1:
+            column, order = self._sortKeys[0]
+            permutation = self._permutation(column)
+            return permutation[::-1] if order == Qt.SortOrder.DescendingOrder else permutation
+        if self._multiOrder is None:
+            self._multiOrder = sortPermutation(self._store(), self._sortKeys)
+        return self._multiOrder
+
+    # The rows to show, None when they are just the source rows
+    def _visibleRows(self):
+        count = self._store().rowCount()
+        order = self._order()
+        if order is None:
+            if self._mask is None:
+                return None
+            order = np.arange(count)
+        if self._mask is None:
+            return np.ascontiguousarray(order)
+        return order[self._mask[order]]
+
+    def _filterMask(self):
+        if self._rowFilter is None:
+            return None
+        return self._rowFilter.mask(self.sourceModel().invertedIndex())
+
+    # Overridden
+    def sort(self, column, order=Qt.SortOrder.AscendingOrder):
+        self.setSortKeys([] if column < 0 else [(column, order)])
+
+    def sortKeys(self):
+        return list(self._sortKeys)
+
+    # Sort on several columns, keys is [(column, Qt.SortOrder)] with the
+    # first sort key first. permutation is the order from sortPermutation()
+    # when it was already worked out (ie. by a SortWorker), otherwise it is
+    # worked out here. Either way the view gets one layout change.
+    def setSortKeys(self, keys, permutation=None):
+        keys = list(keys)
+        count = self._store().rowCount()
+        if permutation is not None and len(keys) == 1:
+            if len(permutation) < count:
+                # Rows were appended after the permutation was worked out
+                permutation = _mergeAppended(self._store().column(keys[0][0]), permutation)
+            self._permutations[keys[0][0]] = permutation
+        self._sortKeys = keys
+        self._stopSorter()
+        if len(keys) > 1 and permutation is not None and len(permutation) == count:
+            self._multiOrder = permutation
         else:
-            pmodel.setFilterFixedString(s)
+            self._multiOrder = None
+        self._update(self._visibleRows())
+
+    # Only show rows where the column is exactly the value
+    def setFilter(self, column, value):
+        self.setRowFilter(RowFilter(column, values=[value]))
+
+    # Only show the rows that pass the filter, see RowFilter. The filter
+    # is worked out again whenever a column it looks at changes.
+    def setRowFilter(self, rowFilter):
+        self._rowFilter = rowFilter
+        self._mask = self._filterMask()
+        self._update(self._visibleRows())
+
+    def rowFilter(self):
+        return self._rowFilter
+
+    # Show every row again
+    def clearFilter(self):
+        self.setFilterMask(None)
+
+    # Show the rows where a boolean mask over the source rows is True
+    def setFilterMask(self, mask):
+        self._rowFilter = None
+        self._mask = None if mask is None else np.asarray(mask, dtype=bool)
+        self._update(self._visibleRows())
+
+    # Move from the rows currently shown to the new rows with as few
+    # signals as possible: remove the rows that went away, one layout
+    # change if the rows left over were reordered, then insert new rows.
+    def _update(self, rows):
+        if rows is None and self._rows is None:
+            return
+        count = self._store().rowCount()
+        final = rows
+        if rows is None:
+            rows = np.arange(count)
+        rows = np.asarray(rows, dtype=np.int64)
+        old = self._rows = self.sourceRows()
+        inNew = np.zeros(count, dtype=bool)
+        inNew[rows] = True
+        inOld = np.zeros(count, dtype=bool)
+        inOld[old] = True
+        removed = _runs(np.flatnonzero(~inNew[old]))
+        inserted = _runs(np.flatnonzero(~inOld[rows]))
+        if len(removed) + len(inserted) > WindowProxyModel.MAX_RUNS:
+            self.beginResetModel()
+            self._rows = final
+            self._inverse = None
+            self.endResetModel()
+            return
+
+        for first, last in reversed(removed):
+            self.beginRemoveRows(QModelIndex(), first, last)
+            self._rows = np.delete(self._rows, np.s_[first:last + 1])
+            self._inverse = None
+            self.endRemoveRows()
+
+        common = rows[inOld[rows]]
+        if not np.array_equal(common, self._rows):
+            self.layoutAboutToBeChanged.emit([], QAbstractItemModel.LayoutChangeHint.VerticalSortHint)
+            persistent = self.persistentIndexList()
+            sources = [int(self._rows[i.row()]) for i in persistent]
+            self._rows = common
+            self._inverse = None
+            inverse = self._inverseRows()
+            self.changePersistentIndexList(persistent, [self.index(int(inverse[r]), i.column())
+                                                        for r, i in zip(sources, persistent)])
+            self.layoutChanged.emit([], QAbstractItemModel.LayoutChangeHint.VerticalSortHint)
+
+        for first, last in inserted:
+            self.beginInsertRows(QModelIndex(), first, last)
+            self._rows = np.insert(self._rows, first, rows[first:last + 1])
+            self._inverse = None
+            self.endInsertRows()
+        self._rows = final
+        self._inverse = None
+
+    def _sourceDataChanged(self, topLeft, bottomRight, roles=()):
+        columns = range(topLeft.column(), bottomRight.column() + 1)
+        for column in columns:
+            self._permutations.pop(column, None)
+        resort = any(column in columns for column, _ in self._sortKeys)
+        if resort:
+            self._multiOrder = None
+            self._stopSorter()
+        if resort or (self._rowFilter is not None and not self._rowFilter.columns().isdisjoint(columns)):
+            if self.sourceModel().isFlushing():
+                # Wait for the rest of the batch, see _sourceFlushed()
+                self._stale = True
+            else:
+                self._refresh()
+
+        # Pass the change on for whichever rows are still showing
+        if self._rows is None:
+            proxyRows = np.arange(topLeft.row(), min(bottomRight.row() + 1, self._sourceCount))
+        else:
+            proxyRows = self._inverseRows()[topLeft.row():bottomRight.row() + 1]
+            proxyRows = proxyRows[proxyRows >= 0]
+        if len(proxyRows):
+            self.dataChanged.emit(self.index(int(proxyRows.min()), topLeft.column()),
+                                  self.index(int(proxyRows.max()), bottomRight.column()), roles)
+
+    def _sourceFlushed(self, columns):
+        if self._stale:
+            self._stale = False
+            self._refresh()
+
+    # Filter and sort again after the data changed
+    def _refresh(self):
+        if self._rowFilter is not None:
+            self._mask = self._filterMask()
+        self._update(self._visibleRows())
+
+    def _sourceRowsInserted(self, parent, first, last):
+        if first != self._sourceCount:
+            # Only appends keep the existing source rows where they were
+            self._sourceReset()
+            return
+        # Sorting the whole column again for every batch is what makes
+        # loading a big file slow, so the new rows are merged into the
+        # order of the sorted column. The other cached columns are sorted
+        # again when they are needed.
+        permutations, self._permutations = self._permutations, {}
+        if len(self._sortKeys) == 1:
+            column = self._sortKeys[0][0]
+            if column in permutations:
+                self._permutations[column] = _mergeAppended(self._store().column(column), permutations[column])
+        elif self._multiOrder is not None:
+            # Several keys can't be merged like that. The new rows are
+            # shown at the end until a SortWorker has put them in place.
+            self._multiOrder = np.concatenate([self._multiOrder, np.arange(first, last + 1)])
+            self._resort()
+        if self._rowFilter is not None:
+            self._mask = self._filterMask()
+        elif self._mask is not None:
+            # New rows are shown until the mask says otherwise
+            self._mask = np.concatenate([self._mask, np.ones(last - first + 1, dtype=bool)])
+        self._inverse = None
+        rows = self._visibleRows()
+        if rows is None and self._rows is None:
+            self.beginInsertRows(QModelIndex(), first, last)
+            self._sourceCount = self._store().rowCount()
+            self.endInsertRows()
+            return
+        self._update(rows)
+        self._sourceCount = self._store().rowCount()
+
+    # Sort on all the sort keys again on a SortWorker, unless one is
+    # already at it. It picks up the rows appended meanwhile when done.
+    def _resort(self):
+        if self._sorter is not None:
+            return
+        sorter = SortWorker(self._store(), self._sortKeys)
+        sorter.sortDone.connect(lambda permutation, keys, sorter=sorter: self._resorted(sorter, permutation, keys))
+        sorter.finished.connect(lambda sorter=sorter: self._sorters.remove(sorter))
+        # Keep hold of it until the thread is done, even when stopped
+        self._sorters.append(sorter)
+        self._sorter = sorter
+        sorter.start()
+
+    def _resorted(self, sorter, permutation, keys):
+        if sorter is not self._sorter:
+            return
+        self._sorter = None
+        count = self._store().rowCount()
+        self._multiOrder = np.concatenate([permutation, np.arange(sorter.rows, count)])
+        self._update(self._visibleRows())
+        if sorter.rows < count:
+            self._resort()
+
+    # The sort keys or the data changed, whatever it works out is no use
+    def _stopSorter(self):
+        if self._sorter is not None:
+            self._sorter.requestInterruption()
+            self._sorter = None
+
+    def _sourceReset(self, *args):
+        self.beginResetModel()
+        self._permutations.clear()
+        self._multiOrder = None
+        self._stopSorter()
+        self._sourceCount = self._store().rowCount()
+        if self._mask is not None and len(self._mask) != self._store().rowCount():
+            self._mask = self._filterMask()
+        self._rows = self._visibleRows()
+        self._inverse = None
+        self.endResetModel()
+
+
+# Merge the changed rows of each column ({column: sorted rows}) into
+# (top, left, bottom, right) rectangles. Runs of rows are found in each
+# column and columns next to each other with the same run are joined.
+def _rectangles(changed, limit):
+    spans = {}
+    for column in sorted(changed):
+        for span in _runs(changed[column]):
+            spans.setdefault(span, []).append(column)
+    rectangles = []
+    for (top, bottom), columns in spans.items():
+        for left, right in _runs(np.array(columns)):
+            rectangles.append((top, left, bottom, right))
+    if len(rectangles) > limit:
+        return [(min(r[0] for r in rectangles), min(r[1] for r in rectangles),
+                 max(r[2] for r in rectangles), max(r[3] for r in rectangles))]
+    return rectangles
+
+
+# The stable ascending order of a column of values
+def _argsort(values):
+    try:
+        return np.argsort(values, kind='stable')
+    except TypeError:
+        # Values that don't compare with each other (ie. None and ints)
+        keys = [(type(v).__name__, str(v)) for v in values.tolist()]
+        return np.array(sorted(range(len(keys)), key=keys.__getitem__), dtype=np.int64)
+
+
+# permutation is the stable ascending order of the first rows of values,
+# put the rows after them in their places as well. Equal values keep
+# the older rows first, the same as sorting everything again would.
+def _mergeAppended(values, permutation):
+    count = len(permutation)
+    tail = count + _argsort(values[count:])
+    try:
+        places = np.searchsorted(values[permutation], values[tail], side='right')
+    except TypeError:
+        return _argsort(values)
+    return np.insert(permutation, places, tail)
+
+
+# Each value's place among the distinct values of the column, so
+# columns of any type can be sorted together (and negated for descending)
+def _ranks(values):
+    try:
+        return np.unique(values, return_inverse=True)[1].astype(np.int64).ravel()
+    except TypeError:
+        keys = [(type(v).__name__, str(v)) for v in values.tolist()]
+        rank = {key: n for n, key in enumerate(sorted(set(keys)))}
+        return np.array([rank[key] for key in keys], dtype=np.int64)
+
+
+# The stable order of the store's rows for the sort keys [(column, order)].
+# With a single key it is always the ascending order, the proxy reads it
+# backwards for descending. progress(percent) is called after each step
+# and when cancelled() returns True it gives up and returns None.
+# rows limits the sort to the first rows rows of the store.
+def sortPermutation(store, keys, progress=None, cancelled=None, rows=None):
+    if rows is None:
+        rows = store.rowCount()
+    if len(keys) == 1:
+        permutation = _argsort(store.column(keys[0][0])[:rows])
+        if progress:
+            progress(100)
+        return permutation
+    ranks = []
+    for n, (column, order) in enumerate(keys):
+        if cancelled and cancelled():
+            return None
+        rank = _ranks(store.column(column)[:rows])
+        ranks.append(-rank if order == Qt.SortOrder.DescendingOrder else rank)
+        if progress:
+            progress(100 * (n + 1) // (len(keys) + 1))
+    if cancelled and cancelled():
+        return None
+    # lexsort is stable and takes the last key as the first one
+    permutation = np.lexsort(ranks[::-1])
+    if progress:
+        progress(100)
+    return permutation
+
+
+class SortWorker(QThread):
+    # Works out sortPermutation() away from the GUI thread.
+    # requestInterruption() stops it between steps. Only the rows the
+    # store had when the worker was made are sorted, rows appended while
+    # it runs are left for whoever uses the result (see rows).
+    progress = pyqtSignal(int)
+    sortDone = pyqtSignal(object, list)
+
+    def __init__(self, store, keys):
+        super().__init__()
+        self._store = store
+        self._keys = list(keys)
+        self.rows = store.rowCount()
+
+    # Overridden
+    def run(self):
+        permutation = sortPermutation(self._store, self._keys, self.progress.emit,
+                                      self.isInterruptionRequested, self.rows)
+        if permutation is not None and not self.isInterruptionRequested():
+            self.sortDone.emit(permutation, self._keys)
+
+
+# The text the combo box shows for a value
+def _displayText(value):
+    if isinstance(value, bytes):
+        return value.decode(errors='replace')
+    return str(value)
+
+
+# Split sorted positions into (first, last) runs of consecutive numbers
+def _runs(positions):
+    if len(positions) == 0:
+        return []
+    breaks = np.flatnonzero(np.diff(positions) != 1) + 1
+    starts = np.concatenate([[0], breaks])
+    ends = np.concatenate([breaks - 1, [len(positions) - 1]])
+    return list(zip(positions[starts].tolist(), positions[ends].tolist()))
+
+
+class MappedTableModel(WindowTableModel):
+    # A read only table over a memory mapped file, see MappedStore.
+    # There are no style rules by default since working them out
+    # means reading every column of the file.
+    def __init__(self, store):
+        super().__init__(store)
+        self._styleRules = []
+
+    @classmethod
+    def fromNpy(cls, path, names=None):
+        return cls(MappedStore.fromNpy(path, names))
+
+    @classmethod
+    def fromBinary(cls, path, dtype, offset=0, names=None):
+        return cls(MappedStore.fromBinary(path, dtype, offset, names))
+
+    @classmethod
+    def fromArrow(cls, path):
+        return cls(MappedStore.fromArrow(path))
+
+    # Overridden
+    def flags(self, index):
+        return QAbstractTableModel.flags(self, index)
+
+    # Overridden
+    def setData(self, index, value, role=Qt.ItemDataRole.EditRole):
+        return False
+
+
+class StreamingTableModel(WindowTableModel):
+    # A table model that reads a CSV file as it is needed. The view asks
+    # canFetchMore()/fetchMore() when it scrolls near the bottom, and
+    # loadInBackground() keeps pulling chunks while the event loop is
+    # idle so the whole file ends up loaded while the user is scrolling.
+    def __init__(self, path, chunkRows=5000, delimiter=','):
+        self._chunks = csvChunks(path, chunkRows, delimiter)
+        header = next(self._chunks)
+        super().__init__(ColumnStore([np.empty(0) for _ in header], header))
+        self._timer = None
+        self._fetching = False
+
+    # Overridden
+    def canFetchMore(self, parent):
+        return not parent.isValid() and self._chunks is not None and not self._fetching
+
+    # Overridden
+    def fetchMore(self, parent):
+        if parent.isValid() or self._chunks is None or self._fetching:
+            return
+        chunk = next(self._chunks, None)
+        if chunk is None:
+            self._chunks = None
+            if self._timer is not None:
+                self._timer.stop()
+            return
+        # Views can ask for more while they hear about these rows
+        self._fetching = True
+        try:
+            self.appendRows(chunk)
+        finally:
+            self._fetching = False
+
+    # Fetch a chunk each time the event loop is idle until the file is done
+    def loadInBackground(self, interval=0):
+        if self._timer is None:
+            self._timer = QTimer(self)
+            self._timer.timeout.connect(lambda: self.fetchMore(QModelIndex()))
+        self._timer.setInterval(interval)
+        self._timer.start()
+
+
+class HotPathStats:
+    # Opt-in timing of the Qt callbacks that run while painting, sorting
+    # and filtering. enable() swaps the methods listed in METHODS for
+    # timed wrappers and disable() puts the originals back, so when it is
+    # off there is nothing in the way at all. data() is broken down by role.
+    METHODS = {
+        'WindowTableModel': ['data', 'setData', 'flags', 'rowCount', 'columnCount'],
+        'WindowHeaderModel': ['headerData'],
+        'WindowHeaderView': ['paintSection'],
+        'WindowProxyModel': ['setSortKeys', 'setRowFilter', 'setFilterMask', 'mapToSource', 'mapFromSource'],
+    }
+
+    def __init__(self, samples=4096):
+        self._samples = samples
+        self._originals = {}
+        self.reset()
+
+    def isEnabled(self):
+        return bool(self._originals)
+
+    def enable(self):
+        if self._originals:
+            return
+        for classname, names in HotPathStats.METHODS.items():
+            cls = globals()[classname]
+            for name in names:
+                original = cls.__dict__[name]
+                self._originals[(cls, name)] = original
+                if name == 'data':
+                    wrapper = self._wrapData(classname, original)
+                else:
+                    wrapper = self._wrap(classname + '.' + name, original)
+                setattr(cls, name, wrapper)
+
+    def disable(self):
+        for (cls, name), original in self._originals.items():
+            setattr(cls, name, original)
+        self._originals = {}
+
+    def reset(self):
+        # name -> [count, total seconds, recent durations]
+        self._stats = {}
+
+    def _record(self, name, seconds):
+        stat = self._stats.get(name)
+        if stat is None:
+            stat = self._stats[name] = [0, 0.0, collections.deque(maxlen=self._samples)]
+        stat[0] += 1
+        stat[1] += seconds
+        stat[2].append(seconds)
+
+    def _wrap(self, name, original):
+        record = self._record
+        clock = time.perf_counter
+
+        @functools.wraps(original)
+        def wrapper(*args, **kwargs):
+            start = clock()
+            try:
+                return original(*args, **kwargs)
+            finally:
+                record(name, clock() - start)
+        return wrapper
+
+    def _wrapData(self, classname, original):
+        record = self._record
+        clock = time.perf_counter
+        names = {}
+
+        @functools.wraps(original)
+        def wrapper(model, index, role=Qt.ItemDataRole.DisplayRole):
+            start = clock()
+            try:
+                return original(model, index, role)
+            finally:
+                name = names.get(role)
+                if name is None:
+                    try:
+                        rolename = Qt.ItemDataRole(role).name
+                    except ValueError:
+                        rolename = str(role)
+                    name = names[role] = '%s.data[%s]' % (classname, rolename)
+                record(name, clock() - start)
+        return wrapper
+
+    # {name: {count, total, mean, p50, p95, p99}} with times in seconds.
+    # The percentiles are over the most recent calls.
+    def stats(self):
+        result = {}
+        for name, (count, total, recent) in sorted(self._stats.items()):
+            p50, p95, p99 = np.percentile(np.fromiter(recent, dtype=float, count=len(recent)), [50, 95, 99])
+            result[name] = {'count': count, 'total': total, 'mean': total / count,
+                            'p50': p50, 'p95': p95, 'p99': p99}
+        return result
+
+    def report(self):
+        lines = ['%-40s %10s %10s %10s %10s %10s' % ('callback', 'count', 'total ms', 'p50 us', 'p95 us', 'p99 us')]
+        for name, stat in self.stats().items():
+            lines.append('%-40s %10d %10.1f %10.1f %10.1f %10.1f' % (
+                name, stat['count'], stat['total'] * 1e3, stat['p50'] * 1e6, stat['p95'] * 1e6, stat['p99'] * 1e6))
+        return '\n'.join(lines)
+
+
+# The one everything records into
+hotPathStats = HotPathStats()
+
+
+class HotPathStatsPanel(QDockWidget):
+    # A dockable table of hotPathStats that refreshes itself
+    # twice a second while it is showing.
+    COLUMNS = ['count', 'total', 'mean', 'p50', 'p95', 'p99']
+
+    def __init__(self, stats=hotPathStats, parent=None):
+        super().__init__("Hot Path Stats", parent)
+        self._stats = stats
+        widget = QWidget()
+        layout = QGridLayout()
+        self._enable = QCheckBox("Record")
+        self._enable.setChecked(stats.isEnabled())
+        self._enable.toggled.connect(lambda on: stats.enable() if on else stats.disable())
+        reset = QPushButton("Reset")
+        reset.clicked.connect(stats.reset)
+        self._table = QTableWidget(0, len(HotPathStatsPanel.COLUMNS))
+        self._table.setHorizontalHeaderLabels(['count', 'total ms', 'mean us', 'p50 us', 'p95 us', 'p99 us'])
+        layout.addWidget(self._enable, 0, 0)
+        layout.addWidget(reset, 0, 1)
+        layout.addWidget(self._table, 1, 0, 1, 2)
+        widget.setLayout(layout)
+        self.setWidget(widget)
+        self._timer = QTimer(self)
+        self._timer.timeout.connect(self.refresh)
+        self._timer.start(500)
+
+    def refresh(self):
+        if not self.isVisible():
+            return
+        stats = self._stats.stats()
+        self._table.setRowCount(len(stats))
+        self._table.setVerticalHeaderLabels(list(stats))
+        for i, stat in enumerate(stats.values()):
+            for j, key in enumerate(HotPathStatsPanel.COLUMNS):
+                value = stat[key]
+                if key == 'total':
+                    text = '%.1f' % (value * 1e3)
+                elif key == 'count':
+                    text = str(value)
+                else:
+                    text = '%.1f' % (value * 1e6)
+                self._table.setItem(i, j, QTableWidgetItem(text))
+
+
+class StartupTimeline(QObject):
+    # Prints how long each step of starting up took when the demo is run
+    # with --profile-startup. It also watches for the first paint of a
+    # widget so the work that can wait is started after the window shows.
+    # For the imports themselves, python -X importtime breaks them down.
+    def __init__(self, enabled):
+        super().__init__()
+        self._enabled = enabled
+        self._marks = [('start', _STARTED)]
+        self._painted = {}
+
+    def mark(self, label):
+        if self._enabled:
+            self._marks.append((label, time.perf_counter()))
+
+    # Call back (from the event loop) once the widget has painted
+    def afterFirstPaint(self, widget, callback, label='first paint'):
+        self._painted[widget] = (label, callback)
+        widget.installEventFilter(self)
+
+    # Overridden
+    def eventFilter(self, watched, event):
+        if event.type() == QEvent.Type.Paint and watched in self._painted:
+            label, callback = self._painted.pop(watched)
+            watched.removeEventFilter(self)
+            self.mark(label)
+            QTimer.singleShot(0, callback)
+        return False
+
+    def report(self):
+        if not self._enabled:
+            return
+        previous = _STARTED
+        for label, when in self._marks[1:]:
+            print('%9.1f ms %+9.1f ms  %s' % ((when - _STARTED) * 1e3, (when - previous) * 1e3, label),
+                  file=sys.stderr)
+            previous = when
+
 
 if __name__ == '__main__':
+    # --profile-startup prints a timeline of starting up
+    timeline = StartupTimeline('--profile-startup' in sys.argv)
+    timeline.mark('imports')
+
     # Make the event loop for the application
     app = QApplication([])
     QApplication.setStyle('fusion')
-    # Setup some data
+    # Setup some data. A file can be given on the command line. A CSV
+    # file is streamed in chunks so the window shows up right away and
+    # .npy or Arrow (.arrow/.feather) files are memory mapped.
+    # --stats turns on the hot path stats and shows them in a dock.
+    arguments = [a for a in sys.argv[1:] if not a.startswith('--')]
+    datapath = arguments[0] if arguments else None
     data = a=[[x for x in random.sample(range(1,20),5)] for i in range(random.randrange(50))]
     # These are the models for the application
     # Even though there is a datamodel with the
     # data, we want to be able to sort and filter
     # and for that, we need an intermediate model.
     # The QSortFilterProxyModel is specifically
-    # made for this.
+    # made for this but, WindowProxyModel does the
+    # same thing a whole column at a time.
     # First create the data model
-    datamodel = WindowTableModel(data)
+    # The column store keeps one typed array per column. Pass the
+    # list straight to WindowTableModel to keep the list storage.
+    if datapath and datapath.lower().endswith('.npy'):
+        datamodel = MappedTableModel.fromNpy(datapath)
+    elif datapath and datapath.lower().endswith(('.arrow', '.feather', '.ipc')):
+        datamodel = MappedTableModel.fromArrow(datapath)
+    elif datapath:
+        datamodel = StreamingTableModel(datapath)
+    else:
+        datamodel = WindowTableModel.fromColumns(data)
+    timeline.mark('data model')
 
     # then create a proxy model and set the source
-    # for the proxy model to the datamodel
-    proxymodel = QSortFilterProxyModel()
+    # for the proxy model to the datamodel. Our proxy
+    # sorts and filters whole columns at a time.
+    proxymodel = WindowProxyModel()
     proxymodel.setSourceModel(datamodel)
 
     # Use our customer header class to setup the
     # header row so we can "draw" on it.
     headerview = WindowHeaderView(Qt.Orientation.Horizontal)
     headermodel = WindowHeaderModel()
-    headermodel.setHeaderFromList(["A", "B", "C", "D", "E"])
+    if datapath:
+        headermodel.setHeaderFromList(datamodel.headerNames())
+    else:
+        headermodel.setHeaderFromList(["A", "B", "C", "D", "E"])
 
     # The next couple of lines show the precedence of drawing
-    # the headers. The stylesheet will be applied first and then
-    # the custom header colors.
-    headerview.setStyleSheet("::section {background-color: #F0F1BC;}")
+    # the headers. The default color is used for every section
+    # and then the custom header colors are applied on top.
+    headerview.setDefaultColor("#F0F1BC")
     headerview.setColumnColors({
         "A": {
             "color": "#EDEDED",
@@ -277,25 +2453,26 @@ if __name__ == '__main__':
     mainwindow = QMainWindow()
     mainwidget = QWidget()
     tableview = WindowTableView()
-    combobox = QComboBox()
-    label = QLabel('Filters to Column "A"')
-
-    # Everything will be put on a 2 column
-    # grid. The table will span columns 0 and 1
-    # while the combo box will be in column 1 only.
-    # Once our components are initialized, put them
-    # on the layout
+    columncombo = QComboBox()
+    combobox = CheckComboBox()
+    label = QLabel('Filters to Column')
+
+    # Everything will be put on a 3 column
+    # grid. The table will span columns 0 to 2
+    # while the combo boxes pick the column and
+    # the values. Once our components are initialized,
+    # put them on the layout
     layout = QGridLayout()
     layout.addWidget(label, 0, 0)
-    layout.addWidget(combobox, 0, 1)
-    layout.addWidget(tableview, 1, 0, 1, 2)
+    layout.addWidget(columncombo, 0, 1)
+    layout.addWidget(combobox, 0, 2)
+    layout.addWidget(tableview, 1, 0, 1, 3)
 
     # The table is created but it is blank.
     # We need to compose it a little by telling
     # it where the data is coming and if the
     # table can be sorted.
     tableview.setModel(proxymodel)
-    tableview.setSortingEnabled(True)
 
     # Next, we will beautify it a little
     # by resizing the columns (header) to the
@@ -303,26 +2480,72 @@ if __name__ == '__main__':
     # and establishing the sort order when the
     # table is initially drawn with data and
     # when we select "All" data in the combo box.
+    # Shift+click on the header sorts on more
+    # than one column.
+    # Only the first rows are looked at to size the columns
+    # so it doesn't matter how big the table is. A memory mapped
+    # file is shown in file order, sorting it up front would read
+    # the whole column off the disk before anything is shown.
     tableview.setHorizontalHeader(headerview)
+    headerview.setResizeContentsPrecision(200)
     tableview.resizeColumnsToContents()
-    tableview.sortByColumn(0,Qt.SortOrder.AscendingOrder)
+    tableview.setMultiColumnSorting(True)
+    if not isinstance(datamodel, MappedTableModel):
+        tableview.sortByColumns([(0, Qt.SortOrder.AscendingOrder)])
+    timeline.mark('table view')
+
+    # Add the unique data items for the picked column to the
+    # combo box and connect a listener to it. The values come
+    # from the model's distinct value index so switching columns
+    # doesn't rescan the table. This is done after the window
+    # has painted (see below) so it doesn't hold up the start.
+    # Finding the values of a memory mapped column reads all of it off
+    # the disk, so for those it waits until the list is opened.
+    def fillValues(column):
+        combobox.blockSignals(True)
+        combobox.clear()
+        if isinstance(datamodel, MappedTableModel):
+            combobox.addItems(['All'])
+        else:
+            combobox.addItems(datamodel.uniqueValues(column))
+        combobox.blockSignals(False)
+        datamodel.applyFilter('All', proxymodel, column)
 
-    # Add the unique data items to the combo box
-    # and connect a listener to it
-    combobox.addItems(datamodel.uniqueValues())
-    combobox.currentTextChanged.connect(lambda s : datamodel.applyFilter(s, proxymodel))
+    def fillMappedValues():
+        if isinstance(datamodel, MappedTableModel) and combobox.count() == 1:
+            combobox.addItems(datamodel.uniqueValues(columncombo.currentIndex())[1:])
+
+    def fillCombos():
+        columncombo.addItems([str(headermodel.headerData(j, Qt.Orientation.Horizontal))
+                              for j in range(headermodel.columnCount(0))])
+        columncombo.currentIndexChanged.connect(fillValues)
+        fillValues(0)
+        combobox.aboutToShowPopup.connect(fillMappedValues)
+        combobox.checkedChanged.connect(lambda s : datamodel.applyFilter(s, proxymodel, columncombo.currentIndex()))
+        timeline.mark('combo boxes')
+        timeline.report()
 
     # Once the main widget has been composed,
     # put it in the main window
     mainwindow.setCentralWidget(mainwidget)
+    if '--stats' in sys.argv:
+        hotPathStats.enable()
+        mainwindow.addDockWidget(Qt.DockWidgetArea.BottomDockWidgetArea, HotPathStatsPanel(parent=mainwindow))
 
     # Finish up by sizing the main widget in
     # the main window. Then, show them
     mainwidget.setLayout(layout)
     mainwidget.resize(mainwidget.sizeHint())
     mainwindow.resize(mainwindow.sizeHint())
+    # Fill the combo boxes once the table has painted
+    timeline.afterFirstPaint(tableview.viewport(), fillCombos)
     mainwidget.show()
     mainwindow.show()
+    timeline.mark('window shown')
+
+    # Keep reading the rest of the file once the window is up
+    if isinstance(datamodel, StreamingTableModel):
+        datamodel.loadInBackground()
 
     # Enter the event loop
     sys.exit(app.exec())
@@ -1,9 +1,668 @@
+import argparse
+import collections
+import json
+import math
+import os
 import sys
-import random
+import time
+import tracemalloc
+import zlib
 
-from PyQt6.QtCore import Qt, QPoint, QTimer
-from PyQt6.QtGui import QPainter, QPixmap, QImage
-from PyQt6.QtWidgets import QApplication, QLabel, QMainWindow
+import numpy as np
+from PyQt6.QtCore import Qt, QTimer, QRect, QRectF, QPointF, QEvent
+from PyQt6.QtGui import QPainter, QImage, QKeyEvent, QMouseEvent, QColor
+from PyQt6.QtWidgets import QApplication, QMainWindow, QWidget, QSizePolicy
+
+
+class GameLoop:
+    """
+    One timer drives the whole game. The game moves forward in fixed
+    ticks (TICK_TIME ms) no matter how often the timer fires, and each
+    system (stars, lines, ship) runs every so many ms inside those ticks.
+    The screen is presented once per display frame, and only when a
+    system drew something.
+
+    Frame pacing: every frame is scheduled for a fixed time instead of
+    a fixed wait, so a late frame doesn't push all the others back.
+    Frame skip: no more than MAX_TICKS ticks are run for one frame. If
+    the game falls further behind than that (a window drag, a slow
+    machine) the rest of the time is dropped and the game slows down
+    instead of trying to catch up forever.
+    """
+    TICK_TIME = 10
+    MAX_TICKS = 5
+
+    def __init__(self, present, frameTime=None):
+        self.present = present
+        if frameTime is None:
+            screen = QApplication.primaryScreen()
+            rate = screen.refreshRate() if screen is not None else 0
+            frameTime = 1000 / rate if rate > 0 else 1000 / 60
+        self.frameTime = frameTime
+        # [name, interval in ms, ms waiting to be run, function]
+        self.systems = []
+        self.lag = 0
+        self.ticks = 0
+        self.frames = 0
+        self.skipped = 0
+        # For the profiler: when the last frames ran, how late the timer
+        # was for each and, while profiling, ms spent in each system
+        self.frameTimes = collections.deque(maxlen=120)
+        self.lateness = collections.deque(maxlen=120)
+        self.profiling = False
+        self.timings = {}
+        self.running = False
+        self.last = None
+        self.nextFrame = None
+        self.timer = QTimer()
+        self.timer.setSingleShot(True)
+        self.timer.setTimerType(Qt.TimerType.PreciseTimer)
+        self.timer.timeout.connect(self.frame)
+
+    """
+        Function: add_system
+        Parameters: name - used to change the interval later
+                    interval - run the function every interval ms
+                    function - returns True when it drew something
+        Return: none
+    """
+    def add_system(self, name, interval, function):
+        self.systems.append([name, interval, 0, function])
+
+    def set_interval(self, name, interval):
+        for system in self.systems:
+            if system[0] == name:
+                system[1] = max(GameLoop.TICK_TIME, interval)
+
+    def start(self):
+        self.running = True
+        self.last = time.perf_counter()
+        self.nextFrame = self.last * 1000 + self.frameTime
+        self.timer.start(round(self.frameTime))
+
+    def stop(self):
+        self.running = False
+        self.timer.stop()
+
+    def frame(self):
+        now = time.perf_counter()
+        self.frameTimes.append(now)
+        self.lateness.append(now * 1000 - self.nextFrame)
+        self.advance((now - self.last) * 1000)
+        self.last = now
+        if not self.running:
+            return
+        # Aim for the next frame time. If we are already past it the
+        # frame is skipped and the schedule starts again from now.
+        self.nextFrame += self.frameTime
+        wait = self.nextFrame - time.perf_counter() * 1000
+        if wait < 0:
+            self.nextFrame = time.perf_counter() * 1000 + self.frameTime
+            wait = self.frameTime
+        self.timer.start(round(wait))
+
+    """
+        Function: advance
+        Parameters: elapsed - ms since the last frame
+        Return: none
+
+        Description: Runs as many fixed ticks as fit in the time that
+                     went by (up to MAX_TICKS) and presents once.
+    """
+    def advance(self, elapsed):
+        self.lag += elapsed
+        drew = False
+        ticks = 0
+        while self.lag >= GameLoop.TICK_TIME:
+            if ticks == GameLoop.MAX_TICKS:
+                self.skipped += int(self.lag // GameLoop.TICK_TIME)
+                self.lag %= GameLoop.TICK_TIME
+                break
+            drew = self.tick() or drew
+            self.lag -= GameLoop.TICK_TIME
+            ticks += 1
+        if drew:
+            self.present()
+        self.frames += 1
+
+    def tick(self):
+        drew = False
+        for system in self.systems:
+            system[2] += GameLoop.TICK_TIME
+            if system[2] >= system[1]:
+                system[2] -= system[1]
+                if self.profiling:
+                    start = time.perf_counter()
+                    drew = system[3]() is not False or drew
+                    timing = self.timings.setdefault(system[0], [0.0, 0])
+                    timing[0] += (time.perf_counter() - start) * 1000
+                    timing[1] += 1
+                else:
+                    drew = system[3]() is not False or drew
+        self.ticks += 1
+        return drew
+
+
+class GameCanvas(QWidget):
+    """
+    The screen of the game. The systems draw the background into
+    screen (an image at the game's size, either with a QPainter or
+    straight into its pixels()) and tell the canvas which
+    parts they changed with invalidate(). present() then asks Qt to
+    repaint only those parts, so a frame where only the ship moved
+    costs two 32x32 copies instead of the whole 640x480 screen.
+
+    Sprites (the ship) are not drawn into the background, they are
+    drawn on top in paintEvent(), so moving one just repaints where it
+    was and where it is now with nothing to erase. A sprite is a part
+    of an image, usually a SpriteAtlas.
+
+    The widget can be any size, the game is scaled to fit.
+    """
+    MAX_RECTS = 64
+
+    def __init__(self, width, height):
+        super().__init__()
+        self.screen = QImage(width, height, QImage.Format.Format_RGB32)
+        self.screen.fill(Qt.GlobalColor.black)
+        self._pixels = None
+        # name -> [x, y, image, rect of the image to draw] in game coordinates
+        self.sprites = {}
+        self.dirty = []
+        self.paints = 0
+        self.paintTime = 0.0
+        # Lines of text drawn over the top left corner, see set_overlay()
+        self.overlay = None
+        self.overlayRect = QRect()
+        self.setSizePolicy(QSizePolicy.Policy.Expanding, QSizePolicy.Policy.Expanding)
+        self.setMinimumSize(width // 4, height // 4)
+        # Everything we paint is opaque, Qt doesn't need to clear first
+        self.setAttribute(Qt.WidgetAttribute.WA_OpaquePaintEvent)
+
+    def sizeHint(self):
+        return self.screen.size()
+
+    # The screen's pixels as a (height, width) array of 0xffRRGGBB that
+    # writes straight into the image. 32 bit rows are never padded so
+    # it is one contiguous block.
+    def pixels(self):
+        if self._pixels is None:
+            bits = self.screen.bits()
+            bits.setsize(self.screen.sizeInBytes())
+            self._pixels = np.frombuffer(bits, dtype=np.uint32).reshape(
+                self.screen.height(), self.screen.bytesPerLine() // 4)[:, :self.screen.width()]
+        return self._pixels
+
+    # Widget pixels per game pixel
+    def scale(self):
+        return self.width() / self.screen.width(), self.height() / self.screen.height()
+
+    # A rect in game coordinates to the widget pixels that cover it
+    def to_widget(self, rect):
+        sx, sy = self.scale()
+        left = math.floor(rect.left() * sx)
+        top = math.floor(rect.top() * sy)
+        right = math.ceil((rect.right() + 1) * sx)
+        bottom = math.ceil((rect.bottom() + 1) * sy)
+        return QRect(left, top, right - left, bottom - top).adjusted(-1, -1, 1, 1)
+
+    """
+        Function: invalidate
+        Parameters: rects - QRects in game coordinates that changed
+        Return: none
+    """
+    def invalidate(self, *rects):
+        self.dirty.extend(rects)
+
+    """
+        Function: set_sprite
+        Parameters: name, x, y
+                    sprite - (image, rect) as given by SpriteAtlas.sprite()
+        Return: True if the sprite moved or changed
+
+        Description: Places a sprite on top of the background and
+                     marks where it was and where it is now.
+    """
+    def set_sprite(self, name, x, y, sprite):
+        image, source = sprite
+        old = self.sprites.get(name)
+        if old is not None and old[0] == x and old[1] == y and old[2] is image and old[3] == source:
+            return False
+        if old is not None:
+            self.invalidate(QRect(old[0], old[1], old[3].width(), old[3].height()))
+        self.sprites[name] = [x, y, image, source]
+        self.invalidate(QRect(x, y, source.width(), source.height()))
+        return True
+
+    """
+        Function: present
+        Parameters: none
+        Return: none
+
+        Description: Asks for a repaint of what changed since the
+                     last frame. Lots of little changes are sent as
+                     the one rect around all of them.
+    """
+    def present(self):
+        if not self.dirty:
+            return
+        rects, self.dirty = self.dirty, []
+        if len(rects) > GameCanvas.MAX_RECTS:
+            bounds = rects[0]
+            for rect in rects[1:]:
+                bounds = bounds.united(rect)
+            rects = [bounds]
+        for rect in rects:
+            self.update(self.to_widget(rect))
+
+    # Show lines of text over the game, None hides them
+    def set_overlay(self, lines):
+        if lines is None and self.overlay is None:
+            return
+        self.overlay = lines
+        self.invalidate(self.overlayRect)
+        if lines is not None:
+            self.overlayRect = QRect(4, 4, 260, 16 * len(lines) + 10)
+            self.invalidate(self.overlayRect)
+
+    # Overridden. Qt hands us the parts that need painting and clips
+    # to them, so only those parts of the screen are copied.
+    def paintEvent(self, event):
+        self.paints += 1
+        started = time.perf_counter()
+        target = event.rect()
+        sx, sy = self.scale()
+        painter = QPainter(self)
+        painter.drawImage(QRectF(target), self.screen,
+                           QRectF(target.x() / sx, target.y() / sy, target.width() / sx, target.height() / sy))
+        for x, y, image, source in self.sprites.values():
+            rect = QRectF(x * sx, y * sy, source.width() * sx, source.height() * sy)
+            if rect.intersects(QRectF(target)):
+                painter.drawImage(rect, image, QRectF(source))
+        if self.overlay is not None:
+            box = self.to_widget(self.overlayRect)
+            if box.intersects(target):
+                painter.fillRect(box, QColor(0, 0, 0, 170))
+                painter.setPen(Qt.GlobalColor.green)
+                painter.drawText(box.adjusted(6, 4, -4, -4), Qt.AlignmentFlag.AlignLeft, '\n'.join(self.overlay))
+        painter.end()
+        self.paintTime += (time.perf_counter() - started) * 1000
+
+
+class SpriteAtlas:
+    """
+    Loads each picture once (from the folder this file is in, not
+    wherever the game was started from) and converts it to premultiplied
+    ARGB, the format QPainter draws fastest.
+
+    The sizes the game asks for are scaled once and packed into one big
+    atlas image, left to right in shelves. sprite() hands back the atlas
+    and the part of it to draw, so after the first frame drawing a
+    sprite never decodes, scales or converts anything. The scaled
+    sprites are kept in an LRU, when there are more than capacity the
+    least used is dropped and its space is reclaimed the next time the
+    atlas fills up and is packed again.
+    """
+    # Transparent pixels between sprites so scaling never bleeds
+    PADDING = 1
+
+    def __init__(self, folder=None, size=512, capacity=64):
+        self.folder = folder or os.path.dirname(os.path.abspath(__file__))
+        self.capacity = capacity
+        # name -> premultiplied QImage at its own size
+        self.images = {}
+        # (name, width, height) -> QRect in the atlas, least used first
+        self.scaled = collections.OrderedDict()
+        self.atlas = self._new_atlas(size)
+        # x, y and height of the shelf being filled
+        self.shelf = [0, 0, 0]
+
+    @staticmethod
+    def _new_atlas(size):
+        atlas = QImage(size, size, QImage.Format.Format_ARGB32_Premultiplied)
+        atlas.fill(Qt.GlobalColor.transparent)
+        return atlas
+
+    """
+        Function: load
+        Parameters: name - what the sprite is called in the game
+                    filename - relative to the folder
+        Return: none
+    """
+    def load(self, name, filename):
+        if name in self.images:
+            return
+        path = os.path.join(self.folder, filename)
+        image = QImage(path)
+        if image.isNull():
+            raise FileNotFoundError(f"Can't load sprite {name} from {path}")
+        self.images[name] = image.convertToFormat(QImage.Format.Format_ARGB32_Premultiplied)
+
+    """
+        Function: sprite
+        Parameters: name, width, height
+        Return: (atlas image, QRect of the sprite in it)
+    """
+    def sprite(self, name, width, height):
+        key = (name, width, height)
+        rect = self.scaled.get(key)
+        if rect is not None:
+            self.scaled.move_to_end(key)
+            return self.atlas, rect
+        image = self.images[name].scaled(width, height, Qt.AspectRatioMode.IgnoreAspectRatio,
+                                         Qt.TransformationMode.SmoothTransformation)
+        rect = self._place(width, height)
+        if rect is None:
+            self._repack(width, height)
+            rect = self._place(width, height)
+        painter = QPainter(self.atlas)
+        painter.setCompositionMode(QPainter.CompositionMode.CompositionMode_Source)
+        painter.drawImage(rect.topLeft(), image)
+        painter.end()
+        self.scaled[key] = rect
+        if len(self.scaled) > self.capacity:
+            self.scaled.popitem(last=False)
+        return self.atlas, rect
+
+    # Find room on the current shelf or start a new one, None when full
+    def _place(self, width, height):
+        x, y, shelf = self.shelf
+        pad = SpriteAtlas.PADDING
+        if x + width + pad > self.atlas.width():
+            x, y, shelf = 0, y + shelf, 0
+        if y + height + pad > self.atlas.height() or width + pad > self.atlas.width():
+            return None
+        self.shelf = [x + width + pad, y, max(shelf, height + pad)]
+        return QRect(x, y, width, height)
+
+    # Start a new atlas with just the sprites still in the LRU plus room
+    # for one more. It doubles in size until they all fit.
+    def _repack(self, width, height):
+        old = self.atlas
+        size = old.width()
+        while True:
+            self.atlas = self._new_atlas(size)
+            self.shelf = [0, 0, 0]
+            placed = {}
+            for key, rect in self.scaled.items():
+                placed[key] = self._place(rect.width(), rect.height())
+                if placed[key] is None:
+                    break
+            else:
+                if self._place(width, height) is not None:
+                    break
+            size *= 2
+        self.atlas = self._new_atlas(size)
+        self.shelf = [0, 0, 0]
+        painter = QPainter(self.atlas)
+        painter.setCompositionMode(QPainter.CompositionMode.CompositionMode_Source)
+        for key, rect in self.scaled.items():
+            self.scaled[key] = self._place(rect.width(), rect.height())
+            painter.drawImage(self.scaled[key].topLeft(), old, rect)
+        painter.end()
+
+
+class StarField:
+    """
+    Every star is a row in a few NumPy arrays (x, y, speed, color) so
+    the whole field is twinkled, moved and drawn with a handful of array
+    operations no matter how many stars there are. The stars are written
+    straight into the screen's pixels instead of going through a pen and
+    drawPoint() for each one.
+
+    Each star is put in one of the speed layers at random. A speed is how
+    many pixels the star moves left each tick, 0 keeps it still and a few
+    different speeds give the parallax look.
+    """
+    def __init__(self, count, width, height, speeds=(0,), size=2, rng=None):
+        self.rng = rng if rng is not None else np.random.default_rng()
+        self.count = count
+        self.size = size
+        self.span = width - size
+        self.x = self.rng.uniform(0, self.span, count)
+        self.y = self.rng.integers(0, height - size + 1, count)
+        self.speed = np.asarray(speeds, dtype=float)[self.rng.integers(0, len(speeds), count)]
+        self.colors = self.new_colors()
+        self.rect = QRect(0, 0, width, height)
+
+    def new_colors(self):
+        return self.rng.integers(0, 255 ** 3, self.count, dtype=np.uint32) | np.uint32(0xff000000)
+
+    def moving(self):
+        return bool(self.speed.any())
+
+    def twinkle(self):
+        self.colors = self.new_colors()
+
+    # Move every star left, the ones that go off the edge come back on the right
+    def scroll(self):
+        self.x -= self.speed
+        np.mod(self.x, self.span, out=self.x)
+
+    """
+        Function: draw
+        Parameters: pixels - the screen's pixel array
+        Return: the rect that changed
+
+        Description: Blacks out the stars' part of the screen (one
+                     fill is much quicker than erasing each star) and
+                     writes each one as a size x size square.
+    """
+    def draw(self, pixels):
+        width = pixels.shape[1]
+        flat = pixels.reshape(-1)
+        pixels[:self.rect.height()].fill(0xff000000)
+        start = self.y * width + self.x.astype(np.int64)
+        for dy in range(self.size):
+            for dx in range(self.size):
+                flat[start + (dy * width + dx)] = self.colors
+        return self.rect
+
+
+class Entities:
+    """
+    Everything in the game that moves (the ship, and room for enemies,
+    bullets and pickups) is a row in a set of NumPy arrays: position,
+    velocity, size and sprite number. An entity is just its row number.
+    Moving everything is one multiply-add over the arrays, and dead rows
+    are handed out again by spawn().
+
+    collide() finds the pairs of entities that overlap with a uniform
+    spatial hash: every entity goes in the cellSize grid cells it
+    covers, only entities sharing a cell are compared, and those pairs
+    are checked for overlap all at once. A cell about the size of the
+    bigger entities works best, too big and every entity is compared
+    with too many others, too small and each one lands in lots of cells.
+    """
+    CELL_SIZE = 32
+
+    def __init__(self, capacity=256, cellSize=CELL_SIZE):
+        self.cellSize = cellSize
+        self.count = 0
+        self.x = np.zeros(capacity, dtype=np.float32)
+        self.y = np.zeros(capacity, dtype=np.float32)
+        self.vx = np.zeros(capacity, dtype=np.float32)
+        self.vy = np.zeros(capacity, dtype=np.float32)
+        self.w = np.zeros(capacity, dtype=np.int16)
+        self.h = np.zeros(capacity, dtype=np.int16)
+        self.sprite = np.zeros(capacity, dtype=np.int16)
+        self.alive = np.zeros(capacity, dtype=bool)
+        self.free = []
+
+    # Make room for at least needed rows, doubling like a list does
+    def _grow(self, needed):
+        capacity = len(self.x)
+        if needed <= capacity:
+            return
+        capacity = max(needed, 2 * capacity)
+        for name in ('x', 'y', 'vx', 'vy', 'w', 'h', 'sprite', 'alive'):
+            old = getattr(self, name)
+            new = np.zeros(capacity, dtype=old.dtype)
+            new[:len(old)] = old
+            setattr(self, name, new)
+
+    """
+        Function: spawn
+        Parameters: x, y - top left in pixels
+                    w, h - size in pixels
+                    vx, vy - pixels per second
+                    sprite - which picture to draw
+        Return: the entity (its row number)
+    """
+    def spawn(self, x, y, w, h, vx=0, vy=0, sprite=0):
+        if self.free:
+            entity = self.free.pop()
+        else:
+            entity = self.count
+            self._grow(entity + 1)
+            self.count += 1
+        self.x[entity], self.y[entity] = x, y
+        self.vx[entity], self.vy[entity] = vx, vy
+        self.w[entity], self.h[entity] = w, h
+        self.sprite[entity] = sprite
+        self.alive[entity] = True
+        return entity
+
+    # Spawn a whole batch from arrays, gives back their row numbers
+    def spawn_many(self, x, y, w, h, vx=0, vy=0, sprite=0):
+        n = len(x)
+        entities = np.arange(self.count, self.count + n)
+        self._grow(self.count + n)
+        self.count += n
+        self.x[entities], self.y[entities] = x, y
+        self.vx[entities], self.vy[entities] = vx, vy
+        self.w[entities], self.h[entities] = w, h
+        self.sprite[entities] = sprite
+        self.alive[entities] = True
+        return entities
+
+    def kill(self, entities):
+        # The same entity can be hit by more than one thing in a tick
+        entities = np.unique(np.atleast_1d(entities))
+        entities = entities[self.alive[entities]]
+        self.alive[entities] = False
+        self.vx[entities] = self.vy[entities] = 0
+        self.free.extend(entities.tolist())
+
+    def living(self):
+        return np.flatnonzero(self.alive[:self.count])
+
+    # Move everything by its velocity
+    def update(self, seconds):
+        n = self.count
+        self.x[:n] += self.vx[:n] * seconds
+        self.y[:n] += self.vy[:n] * seconds
+
+    # The living entities that are completely outside the rect
+    def outside(self, rect):
+        entities = self.living()
+        x, y = self.x[entities], self.y[entities]
+        return entities[(x + self.w[entities] <= rect.left()) | (x > rect.right()) |
+                        (y + self.h[entities] <= rect.top()) | (y > rect.bottom())]
+
+    """
+        Function: collide
+        Parameters: none
+        Return: an (n, 2) array of the pairs of entities that overlap,
+                smaller entity number first
+    """
+    def collide(self):
+        entities = self.living()
+        if len(entities) < 2:
+            return np.empty((0, 2), dtype=np.int64)
+        x0 = self.x[entities]
+        y0 = self.y[entities]
+        x1 = x0 + self.w[entities]
+        y1 = y0 + self.h[entities]
+
+        # Put each entity in every cell it covers. Most are smaller than
+        # a cell so they land in 1 to 4 cells.
+        size = self.cellSize
+        cx0 = np.floor(x0 / size).astype(np.int64)
+        cy0 = np.floor(y0 / size).astype(np.int64)
+        cx1 = np.maximum(np.ceil(x1 / size).astype(np.int64) - 1, cx0)
+        cy1 = np.maximum(np.ceil(y1 / size).astype(np.int64) - 1, cy0)
+        local = np.arange(len(entities))
+        members = []
+        keys = []
+        for dx in range(int((cx1 - cx0).max()) + 1):
+            for dy in range(int((cy1 - cy0).max()) + 1):
+                inside = (cx0 + dx <= cx1) & (cy0 + dy <= cy1)
+                members.append(local[inside])
+                keys.append(((cx0[inside] + dx + (1 << 20)) << 21) + cy0[inside] + dy + (1 << 20))
+        members = np.concatenate(members)
+        keys = np.concatenate(keys)
+        order = np.argsort(keys, kind='stable')
+        members = members[order]
+        keys = keys[order]
+
+        # Where each cell's run of members ends
+        starts = np.flatnonzero(np.r_[True, keys[1:] != keys[:-1]])
+        ends = np.r_[starts[1:], len(keys)]
+        groupEnd = np.repeat(ends, ends - starts)
+
+        # Pair every member with the ones after it in the same cell
+        after = groupEnd - np.arange(len(keys)) - 1
+        if not after.any():
+            return np.empty((0, 2), dtype=np.int64)
+        firsts = np.repeat(np.arange(len(keys)), after)
+        seconds = firsts + np.arange(len(firsts)) - np.repeat(np.cumsum(after) - after, after) + 1
+        a = members[firsts]
+        b = members[seconds]
+        cells = keys[firsts]
+        hit = (x0[a] < x1[b]) & (x0[b] < x1[a]) & (y0[a] < y1[b]) & (y0[b] < y1[a])
+        a, b, cells = a[hit], b[hit], cells[hit]
+        # Entities that share more than one cell meet in each of them.
+        # Only keep the pair in the cell where their overlap starts.
+        corner = (((np.floor(np.maximum(x0[a], x0[b]) / size).astype(np.int64) + (1 << 20)) << 21)
+                  + np.floor(np.maximum(y0[a], y0[b]) / size).astype(np.int64) + (1 << 20))
+        a, b = a[corner == cells], b[corner == cells]
+        return np.stack([entities[np.minimum(a, b)], entities[np.maximum(a, b)]], axis=1)
+
+
+class FrameProfiler:
+    """
+    Works out the numbers for the profiler overlay from what the game
+    loop and the canvas keep track of: frames a second, how late the
+    frame timer fires (jitter), ms per tick spent in each system and ms
+    per frame spent painting. The system times are only kept while
+    profiling is on. Each call to lines() covers the time since the
+    last one.
+    """
+    def __init__(self, loop, canvas):
+        self.loop = loop
+        self.canvas = canvas
+        self.frames = loop.frames
+        self.paints = canvas.paints
+        self.paintTime = canvas.paintTime
+
+    def start(self):
+        self.loop.profiling = True
+        self.loop.timings.clear()
+        self.frames = self.loop.frames
+        self.paints = self.canvas.paints
+        self.paintTime = self.canvas.paintTime
+
+    def stop(self):
+        self.loop.profiling = False
+
+    def lines(self):
+        times = self.loop.frameTimes
+        fps = (len(times) - 1) / (times[-1] - times[0]) if len(times) > 1 and times[-1] > times[0] else 0.0
+        late = list(self.loop.lateness)
+        frames = max(1, self.loop.frames - self.frames)
+        paints = self.canvas.paints - self.paints
+        lines = [f"{fps:5.1f} fps  {self.loop.skipped} ticks skipped",
+                 f"jitter {sum(abs(t) for t in late) / max(1, len(late)):5.2f} ms"
+                 f"  worst {max((abs(t) for t in late), default=0):5.2f} ms",
+                 f"paint  {(self.canvas.paintTime - self.paintTime) / frames:5.2f} ms/frame  {paints} paints"]
+        for name, (total, calls) in self.loop.timings.items():
+            lines.append(f"{name:8} {total / max(1, calls):6.3f} ms x {calls}")
+        self.loop.timings.clear()
+        self.frames = self.loop.frames
+        self.paints = self.canvas.paints
+        self.paintTime = self.canvas.paintTime
+        return lines
 
 
 class MainWindow(QMainWindow):
@@ -15,7 +674,8 @@ class MainWindow(QMainWindow):
     __HALF_HEIGHT = int(__SCREEN_HEIGHT * .66)
     __LINE_START = __HALF_HEIGHT
     __NUM_STARS = 250
-    __NUM_COLORS = 255 ** 3
+    # Pixels a tick for each layer of stars, ie. [0.25, 0.5, 1] to scroll
+    __STAR_SPEEDS = [0]
     __BLIT_TIME = 50
     __OFFSETS_0 = [1, 2, 3, 5,  8, 13, 21, 27, 34,  55,  89]
     __OFFSETS_1 = [2, 3, 4, 7, 11, 18, 29, 47, 76, 123, 199]
@@ -24,97 +684,111 @@ class MainWindow(QMainWindow):
     __CURRENT_LINE_SET = 2
     __SHIP_WIDTH = 32
     __SHIP_HEIGHT = 32
+    # Pixels a second while an arrow key is held
+    __SHIP_SPEED = 250
+    # Shows and hides the profiler overlay
+    __PROFILER_KEY = Qt.Key.Key_F3
 
-    def __init__(self):
+    def __init__(self, seed=None, trace=None, frameTime=None, start=True):
         """
         Intialize the class and setup the objects for the class.
-        Objects: label, screen, painter
-        label: central widget for the main window
-        screen: QPixmap object which will be drawn by painter object
+        Objects: canvas, screen, painter
+        canvas: central widget for the main window
+        screen: QImage object which will be drawn by painter object
         painter: QPainter object for drawing
+
+        seed: for the random numbers, the same seed and the same input
+              trace always give the same game
+        trace: [tick, 'press', 'release' or 'mouse', key or button] input to play
+               back as well as the keyboard and mouse
+        frameTime: ms per frame, the screen's refresh rate when None
+        start: False leaves the game loop stopped so it can be driven
+               by hand with loop.advance()
         """
         super().__init__()
-        self.points=[]
-        self.shipX = (MainWindow.__SCREEN_WIDTH/2)-(MainWindow.__SHIP_WIDTH/2)
-        self.shipY = MainWindow.__SCREEN_HEIGHT-MainWindow.__SHIP_HEIGHT
-
-        # Set the locations for the stars
-        for i in range(0,MainWindow.__NUM_STARS):
-            self.points.append(QPoint(random.randint(0, MainWindow.__SCREEN_WIDTH), random.randint(0, MainWindow.__HALF_HEIGHT)))
-
-        # We will use a label as the screen and fill it with the color black.
-        # This will be our screen to draw objects. In order to do that, we
-        # need to setup a Pixel map object to draw.
-        self.label = QLabel()
-        self.screen = QPixmap(MainWindow.__SCREEN_WIDTH, MainWindow.__SCREEN_HEIGHT)
-        self.screen.fill(Qt.GlobalColor.black)
-        # In order to draw on the pixel map, we need a painter object
-        # attached as our canvas.
-        self.painter = QPainter(self.screen)
-        self.label.setPixmap(self.screen)
+        # Each window has its own line speed and line set
+        self.__BLIT_TIME = MainWindow.__BLIT_TIME
+        self.__CURRENT_LINE_SET = MainWindow.__CURRENT_LINE_SET
+        self.seed = seed
+        self.rng = np.random.default_rng(seed)
+        # The input as it happens, by tick, see save_trace()
+        self.recorded = []
+        self.replay = sorted(trace or [], key=lambda event: event[0])
+        self.replayed = 0
+        # The keys held down right now. The ship looks at this once a
+        # tick instead of moving on each key event.
+        self.keys = set()
+        # The ship is the first entity. Enemies, bullets and so on
+        # go in the same arrays.
+        self.entities = Entities()
+        self.ship = self.entities.spawn((MainWindow.__SCREEN_WIDTH//2)-(MainWindow.__SHIP_WIDTH//2),
+                                        MainWindow.__SCREEN_HEIGHT-MainWindow.__SHIP_HEIGHT,
+                                        MainWindow.__SHIP_WIDTH, MainWindow.__SHIP_HEIGHT)
+        self.collisions = self.entities.collide()
 
-        # Setup the images. One is the ship, the other is a blank tile
-        self.shipImage = QImage("r.png").scaled(MainWindow.__SHIP_WIDTH,MainWindow.__SHIP_HEIGHT,Qt.AspectRatioMode.IgnoreAspectRatio)
-        self.shipBlank = QImage("b.png").scaled(MainWindow.__SHIP_WIDTH,MainWindow.__SHIP_HEIGHT,Qt.AspectRatioMode.IgnoreAspectRatio)
+        # Set the locations for the stars. They stay above the lines.
+        self.stars = StarField(MainWindow.__NUM_STARS, MainWindow.__SCREEN_WIDTH, MainWindow.__HALF_HEIGHT,
+                               MainWindow.__STAR_SPEEDS, rng=self.rng)
+
+        # We will use a canvas as the screen. It is filled with the color
+        # black and holds a Pixel map object for us to draw on. The canvas
+        # only repaints the parts we say changed.
+        self.canvas = GameCanvas(MainWindow.__SCREEN_WIDTH, MainWindow.__SCREEN_HEIGHT)
+        self.screen = self.canvas.screen
+        # In order to draw on the pixel map, we need a painter object.
+        # Each draw begins and ends it on the screen.
+        self.painter = QPainter()
+
+        # Setup the ship image. It is drawn on top of the screen by the
+        # canvas so there is no blank tile to erase it with anymore.
+        # The atlas loads it next to this file and scales it once.
+        self.assets = SpriteAtlas()
+        self.assets.load('ship', 'r.png')
 
         # Set the main window widget to the drawable screen
-        self.setCentralWidget(self.label)
+        self.setCentralWidget(self.canvas)
 
         # We have to draw the stars or these will just appear
         # one second after the screen is drawn.
         self.draw_stars()
 
-        # Instead of an event loop for changing stars and lines
-        # we will use a QTimer object. One for the stars, 
-        # one for the lines and one for the ship. We do this because
-        # each function has different timings. We could count clocks
-        # but, these are built for the job.
-
-        # Stars blink every 1 second
-        self.starTimer=QTimer()
-        self.starTimer.setInterval(1000)
-        self.starTimer.timeout.connect(self.draw_stars)
-        self.starTimer.start()
-
-        # __BLIT_TIME is dynamic
-        self.lineTimer=QTimer()
-        self.lineTimer.timeout.connect(self.draw_lines)
-        self.lineTimer.setInterval(MainWindow.__BLIT_TIME)
-        self.lineTimer.start()
-
-        # Repaint the ship after every one ms
-        self.shipTimer=QTimer()
-        self.shipTimer.timeout.connect(self.draw_ship)
-        self.shipTimer.setInterval(1)
-        self.shipTimer.start()
+        # A single game loop runs the stars, the lines and the ship,
+        # each at its own rate, and puts the screen up once a frame.
+        # Stars blink every 1 second, __BLIT_TIME is dynamic and the
+        # ship is checked every tick (it is only redrawn when it moved).
+        self.loop = GameLoop(self.present, frameTime)
+        # Played back input goes in before anything moves
+        self.loop.add_system('input', GameLoop.TICK_TIME, self.play_input)
+        self.loop.add_system('controls', GameLoop.TICK_TIME, self.read_controls)
+        self.loop.add_system('stars', 1000, self.draw_stars)
+        if self.stars.moving():
+            self.loop.add_system('scroll', GameLoop.TICK_TIME, self.scroll_stars)
+        self.loop.add_system('lines', self.__BLIT_TIME, self.draw_lines)
+        self.loop.add_system('entities', GameLoop.TICK_TIME, self.move_entities)
+        self.loop.add_system('ship', GameLoop.TICK_TIME, self.draw_ship)
+        self.profiler = FrameProfiler(self.loop, self.canvas)
+        self.loop.add_system('profiler', 500, self.show_profile)
         self.draw_ship()
+        self.present()
+        if start:
+            self.loop.start()
     """
         Function: draw_stars
         Parameters: none
         Return: none
 
-        Description: The stars are fixed points and are
-                     set when the function is initialized.
-                     draw_stars() will cause the colors to
-                     change.
+        Description: The stars are set when the function is
+                     initialized. draw_stars() will cause the
+                     colors to change, all at once.
     """
     def draw_stars(self):
+        self.stars.twinkle()
+        self.canvas.invalidate(self.stars.draw(self.canvas.pixels()))
 
-        # Tell the painter we are starting to draw on the canvas
-        self.painter.begin(self.screen)
-
-        # For each star, chose a random color
-        # and set the point to the random color.
-        for i in range(0, MainWindow.__NUM_STARS):
-             c=random.randint(0,MainWindow.__NUM_COLORS)
-             self.painter.setPen(c)
-             self.painter.pen().setWidth(2)
-             self.painter.drawPoint(self.points[i])
-        # Tell the painter we are done.
-        # We don't need to update the pixmap here. We
-        # will let the draw_lines() function perform
-        # the redraw to our canvas.
-        self.painter.end()
+    # Only runs when some of the stars move, see __STAR_SPEEDS
+    def scroll_stars(self):
+        self.stars.scroll()
+        self.canvas.invalidate(self.stars.draw(self.canvas.pixels()))
 
     """
         Function: draw_lines
@@ -137,9 +811,9 @@ class MainWindow(QMainWindow):
         #for i in range(MainWindow.__HALF_HEIGHT, MainWindow.__SCREEN_HEIGHT):
             #self.painter.drawLine(0, i, MainWindow.__SCREEN_WIDTH,i)
         self.painter.setPen(Qt.GlobalColor.black)
-        if MainWindow.__CURRENT_LINE_SET == 2:
+        if self.__CURRENT_LINE_SET == 2:
             lineset = MainWindow.__OFFSETS_0.copy()
-        elif MainWindow.__CURRENT_LINE_SET == 1:
+        elif self.__CURRENT_LINE_SET == 1:
             lineset = MainWindow.__OFFSETS_2.copy()
         else:
             lineset = MainWindow.__OFFSETS_1.copy()
@@ -149,15 +823,15 @@ class MainWindow(QMainWindow):
                              MainWindow.__LINE_START + lineset[i])
         # Select the next pre-defined line set based on the
         # current line set.
-        if MainWindow.__CURRENT_LINE_SET == 2:
+        if self.__CURRENT_LINE_SET == 2:
             lineset = MainWindow.__OFFSETS_2.copy()
-            MainWindow.__CURRENT_LINE_SET = 1
-        elif MainWindow.__CURRENT_LINE_SET == 1:
+            self.__CURRENT_LINE_SET = 1
+        elif self.__CURRENT_LINE_SET == 1:
             lineset = MainWindow.__OFFSETS_1.copy()
-            MainWindow.__CURRENT_LINE_SET = 0
+            self.__CURRENT_LINE_SET = 0
         else:
             lineset = MainWindow.__OFFSETS_0.copy()
-            MainWindow.__CURRENT_LINE_SET = 2
+            self.__CURRENT_LINE_SET = 2
 
         # Set the line color to cyan. In theory, for a game,
         # for each level, you could have a different color
@@ -169,13 +843,143 @@ class MainWindow(QMainWindow):
         #self.draw_ship()
         # Tell the painter to stop drawing
         self.painter.end()
+        # Only the band with the lines needs repainting
+        self.canvas.invalidate(QRect(0, MainWindow.__LINE_START, MainWindow.__SCREEN_WIDTH + 1,
+                                     MainWindow.__SCREEN_HEIGHT - MainWindow.__LINE_START))
+
+    # The ship's position lives in the entity arrays
+    @property
+    def shipX(self):
+        return int(self.entities.x[self.ship])
+
+    @shipX.setter
+    def shipX(self, x):
+        self.entities.x[self.ship] = x
+
+    @property
+    def shipY(self):
+        return int(self.entities.y[self.ship])
+
+    @shipY.setter
+    def shipY(self, y):
+        self.entities.y[self.ship] = y
+
+    """
+        Function: read_controls
+        Parameters: none
+        Return: False, moving the ship is left to move_entities()
+
+        Description: Turns the arrow keys being held into the ship's
+                     velocity. Two keys at once go diagonally at the
+                     same speed as one.
+    """
+    def read_controls(self):
+        dx = (Qt.Key.Key_Right in self.keys) - (Qt.Key.Key_Left in self.keys)
+        dy = (Qt.Key.Key_Down in self.keys) - (Qt.Key.Key_Up in self.keys)
+        speed = MainWindow.__SHIP_SPEED / math.sqrt(2) if dx and dy else MainWindow.__SHIP_SPEED
+        self.entities.vx[self.ship] = dx * speed
+        self.entities.vy[self.ship] = dy * speed
+        return False
 
+    # Keep the ship on the screen and below the stars, both ways at once
+    def clamp_ship(self):
+        x = self.entities.x[self.ship]
+        y = self.entities.y[self.ship]
+        self.entities.x[self.ship] = min(max(x, 0), MainWindow.__SCREEN_WIDTH - MainWindow.__SHIP_WIDTH)
+        self.entities.y[self.ship] = min(max(y, MainWindow.__HALF_HEIGHT),
+                                         MainWindow.__SCREEN_HEIGHT - MainWindow.__SHIP_HEIGHT)
+
+    """
+        Function: move_entities
+        Parameters: none
+        Return: False, this only moves things, the drawing is done
+                by the systems after it
+
+        Description: Moves every entity one tick, drops the ones that
+                     left the screen and works out what hit what.
+    """
+    def move_entities(self):
+        self.entities.update(GameLoop.TICK_TIME / 1000)
+        self.clamp_ship()
+        gone = self.entities.outside(QRect(0, 0, MainWindow.__SCREEN_WIDTH, MainWindow.__SCREEN_HEIGHT))
+        self.entities.kill(gone[gone != self.ship])
+        self.collisions = self.entities.collide()
+        return False
+
+    """
+        Function: draw_ship
+        Parameters: none
+        Return: False when the ship didn't move so nothing was drawn
+    """
     def draw_ship(self):
-        self.painter.begin(self.screen)
-        self.painter.drawImage(self.shipX, self.shipY, self.shipImage)
-        self.painter.end()
-        # Update the canvas
-        self.label.setPixmap(self.screen)
+        return self.canvas.set_sprite('ship', self.shipX, self.shipY,
+                                      self.assets.sprite('ship', MainWindow.__SHIP_WIDTH, MainWindow.__SHIP_HEIGHT))
+
+    """
+        Function: play_input
+        Parameters: none
+        Return: False, the input handlers don't draw anything
+
+        Description: Sends the trace events for this tick through
+                     keyPressEvent(), keyReleaseEvent() and
+                     mousePressEvent() the same as if they had come
+                     from Qt.
+    """
+    def play_input(self):
+        while self.replayed < len(self.replay) and self.replay[self.replayed][0] <= self.loop.ticks:
+            tick, kind, value = self.replay[self.replayed]
+            self.replayed += 1
+            if kind == 'press':
+                self.keyPressEvent(QKeyEvent(QEvent.Type.KeyPress, value, Qt.KeyboardModifier.NoModifier))
+            elif kind == 'release':
+                self.keyReleaseEvent(QKeyEvent(QEvent.Type.KeyRelease, value, Qt.KeyboardModifier.NoModifier))
+            elif kind == 'mouse':
+                button = Qt.MouseButton(value)
+                self.mousePressEvent(QMouseEvent(QEvent.Type.MouseButtonPress, QPointF(), QPointF(), button,
+                                                 button, Qt.KeyboardModifier.NoModifier))
+        return False
+
+    def record(self, kind, value):
+        self.recorded.append([self.loop.ticks, kind, value])
+
+    # Write the seed and the input so far to a JSON file for --replay
+    def save_trace(self, path):
+        with open(path, 'w') as f:
+            json.dump({'seed': self.seed, 'events': self.recorded}, f)
+
+    """
+        Function: present
+        Parameters: none
+        Return: none
+
+        Description: Put the screen up. The game loop calls this
+                     once a frame after the systems have drawn.
+                     Only the parts that changed are repainted.
+    """
+    def present(self):
+        self.canvas.present()
+
+    """
+        Function: show_profile
+        Parameters: none
+        Return: True when the overlay was updated
+
+        Description: Refreshes the profiler overlay twice a second
+                     while it is showing. F3 turns it on and off.
+    """
+    def show_profile(self):
+        if self.canvas.overlay is None:
+            return False
+        self.canvas.set_overlay(self.profiler.lines() + [f"lines every {self.__BLIT_TIME} ms"])
+        return True
+
+    def toggle_profiler(self):
+        if self.canvas.overlay is None:
+            self.profiler.start()
+            self.canvas.set_overlay(["profiling..."])
+        else:
+            self.profiler.stop()
+            self.canvas.set_overlay(None)
     """
         Function: closeEvent()
         Parameter: event - The event will be captured but not used
@@ -186,9 +990,7 @@ class MainWindow(QMainWindow):
         for a window. Stop all timers and close the window.
     """
     def closeEvent(self, event):
-        self.starTimer.stop()
-        self.lineTimer.stop()
-        self.shipTimer.stop()
+        self.loop.stop()
         self.close()
 
     """
@@ -198,43 +1000,146 @@ class MainWindow(QMainWindow):
         Description: This is an override of the default handling of a
                      mouse press. It will increase, reset or decrease
                      the line speed. This is for testing purpose and
-                     would not be in production.
+                     would not be in production. The line speed shows
+                     in the profiler overlay (F3).
     """
     def mousePressEvent(self, event):
+        self.record('mouse', event.button().value)
         if event.button() == Qt.MouseButton.LeftButton:
-            MainWindow.__BLIT_TIME += 1
+            self.__BLIT_TIME += 1
         elif event.button() == Qt.MouseButton.MiddleButton:
-            MainWindow.__BLIT_TIME = 100
+            self.__BLIT_TIME = 100
         elif event.button() == Qt.MouseButton.RightButton:
-            MainWindow.__BLIT_TIME -= 1
-        self.lineTimer.setInterval(MainWindow.__BLIT_TIME)
-        print(MainWindow.__BLIT_TIME)
+            self.__BLIT_TIME -= 1
+        self.loop.set_interval('lines', self.__BLIT_TIME)
+
+    """
+        Function: keyPressEvent() / keyReleaseEvent()
+        Parameter: event - the key
+
+        Description: Only keep track of which keys are down. The
+                     ship reads them once a tick in read_controls().
+                     Held keys send repeats, those are ignored.
+    """
+    def keyPressEvent(self, event):
+        if event.isAutoRepeat():
+            return
+        k=event.key()
+        self.record('press', k)
+        if k == MainWindow.__PROFILER_KEY:
+            self.toggle_profiler()
+        self.keys.add(k)
 
     def keyReleaseEvent(self, event):
-        self.painter.begin(self.screen)
-        self.painter.drawImage(self.shipX, self.shipY, self.shipBlank)
-        self.painter.end()
+        if event.isAutoRepeat():
+            return
         k=event.key()
-        if k == Qt.Key.Key_Up:
-            self.shipY -= 5
-        elif k == Qt.Key.Key_Down:
-            self.shipY += 5
-        elif k == Qt.Key.Key_Left:
-            self.shipX -=5
-        elif k == Qt.Key.Key_Right:
-            self.shipX += 5
-
-        if self.shipX > MainWindow.__SCREEN_WIDTH-MainWindow.__SHIP_WIDTH:
-            self.shipX = MainWindow.__SCREEN_WIDTH-MainWindow.__SHIP_WIDTH
-        elif self.shipX < 0:
-            self.shipX = 0
-        elif self.shipY < MainWindow.__HALF_HEIGHT:
-            self.shipY = MainWindow.__HALF_HEIGHT
-        elif self.shipY > MainWindow.__SCREEN_HEIGHT - MainWindow.__SHIP_HEIGHT:
-            self.shipY = MainWindow.__SCREEN_HEIGHT - MainWindow.__SHIP_HEIGHT
-
-# Set up the application and call the main window.
-app = QApplication(sys.argv)
-window = MainWindow()
-window.show()
-app.exec()
+        self.record('release', k)
+        self.keys.discard(k)
+
+
+def percentile(values, percent):
+    return float(np.percentile(values, percent)) if len(values) else 0.0
+
+
+"""
+    Function: run_headless
+    Parameters: frames - how many frames to run
+                seed, trace - see MainWindow
+                frameTime - game time per frame in ms
+    Return: a dictionary of the results
+
+    Description: Runs the game as fast as it will go with the loop
+                 driven by hand, so frame n is always the same game
+                 no matter how long it took to get there. It runs
+                 twice, once for the frame times and once more with
+                 tracemalloc on (it slows everything down) to see
+                 how much is allocated each frame.
+"""
+def run_headless(frames, seed=0, trace=None, frameTime=1000 / 60):
+    app = QApplication.instance()
+    results = {"frames": frames, "seed": seed, "events": len(trace or [])}
+    for measure in ("time", "memory"):
+        window = MainWindow(seed=seed, trace=trace, frameTime=frameTime, start=False)
+        window.show()
+        app.processEvents()
+        times = []
+        paints = []
+        allocated = []
+        if measure == "memory":
+            tracemalloc.start()
+        else:
+            window.loop.profiling = True
+        for n in range(frames):
+            painted = window.canvas.paints
+            if measure == "memory":
+                tracemalloc.reset_peak()
+                before = tracemalloc.get_traced_memory()[0]
+            start = time.perf_counter()
+            window.loop.advance(frameTime)
+            # This is where the canvas paints what changed
+            app.processEvents()
+            times.append((time.perf_counter() - start) * 1000)
+            paints.append(window.canvas.paints - painted)
+            if measure == "memory":
+                allocated.append(tracemalloc.get_traced_memory()[1] - before)
+        if measure == "memory":
+            tracemalloc.stop()
+            results["alloc_bytes_per_frame_p50"] = percentile(allocated, 50)
+            results["alloc_bytes_per_frame_p99"] = percentile(allocated, 99)
+        else:
+            for percent in (50, 95, 99):
+                results[f"frame_ms_p{percent}"] = percentile(times, percent)
+            results["frame_ms_max"] = max(times, default=0.0)
+            for name, (total, calls) in window.loop.timings.items():
+                results[f"{name}_ms_per_run"] = total / max(1, calls)
+            results["paints_per_frame"] = sum(paints) / max(frames, 1)
+            results["ticks"] = window.loop.ticks
+            # The same seed and trace have to end on the same screen
+            results["ship"] = [window.shipX, window.shipY]
+            results["screen_crc"] = zlib.crc32(window.canvas.pixels().tobytes())
+        window.close()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="A simple PyQt6 game screen")
+    parser.add_argument("--seed", type=int, help="seed for the random numbers")
+    parser.add_argument("--record", help="save the input to this file when the window closes")
+    parser.add_argument("--replay", help="play back the input saved with --record")
+    parser.add_argument("--headless", action="store_true", help="run off screen as fast as possible and report")
+    parser.add_argument("--frames", type=int, default=1000, help="frames to run with --headless")
+    parser.add_argument("--output", help="write the --headless results to this JSON file")
+    args = parser.parse_args()
+
+    seed, trace = args.seed, None
+    if args.replay:
+        with open(args.replay) as f:
+            saved = json.load(f)
+        trace = saved["events"]
+        if seed is None:
+            seed = saved["seed"]
+
+    if args.headless:
+        # No window is needed, render everything off screen
+        os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+        app = QApplication(sys.argv)
+        results = run_headless(args.frames, 0 if seed is None else seed, trace)
+        for key, value in results.items():
+            print(f"  {key:28} {value}")
+        if args.output:
+            with open(args.output, "w") as f:
+                json.dump(results, f, indent=2)
+        return
+
+    # Set up the application and call the main window.
+    app = QApplication(sys.argv)
+    window = MainWindow(seed=seed, trace=trace)
+    window.show()
+    app.exec()
+    if args.record:
+        window.save_trace(args.record)
+
+
+if __name__ == "__main__":
+    main()